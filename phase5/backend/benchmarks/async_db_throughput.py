@@ -0,0 +1,69 @@
+"""
+Concurrent request throughput: sync Session vs AsyncSession inside async routes.
+
+Each request runs one query that takes QUERY_SECONDS on the server. With the
+sync session the query blocks the event loop, so requests are served one at
+a time; with the async session they overlap up to the pool size.
+
+Usage (from phase5/backend, against a disposable database):
+    DATABASE_URL=postgresql://... python -m benchmarks.async_db_throughput
+"""
+import asyncio
+import os
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlmodel import Session
+
+from src import database
+from src.database import get_async_session
+
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "200"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "50"))
+QUERY_SECONDS = float(os.getenv("BENCH_QUERY_SECONDS", "0.01"))
+
+app = FastAPI()
+
+
+@app.get("/sync")
+async def sync_route():
+    # Session opened inline (as the MCP tools do) so the connection is
+    # returned before the handler yields back to the event loop
+    with Session(database.engine) as session:
+        session.exec(text("SELECT pg_sleep(:s)"), params={"s": QUERY_SECONDS})
+    return {}
+
+
+@app.get("/async")
+async def async_route(session=Depends(get_async_session)):
+    await session.exec(text("SELECT pg_sleep(:s)"), params={"s": QUERY_SECONDS})
+    return {}
+
+
+async def run(path: str) -> float:
+    """Return requests per second for REQUESTS calls at CONCURRENCY."""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        await client.get(path)  # warm up the pool
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(REQUESTS)))
+        return REQUESTS / (time.perf_counter() - start)
+
+
+async def main():
+    print(f"{REQUESTS} requests, concurrency {CONCURRENCY}, {QUERY_SECONDS * 1000:.0f} ms query")
+    for label, path in (("sync Session (before)", "/sync"), ("AsyncSession (after)", "/async")):
+        print(f"{label:24} {await run(path):8.1f} req/s")
+    await database.async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
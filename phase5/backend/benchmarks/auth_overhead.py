@@ -0,0 +1,56 @@
+"""
+Per-request authentication overhead of get_current_user.
+
+Times the dependency directly (no HTTP) with the verified-token cache
+disabled, so every call runs jwt.decode, and enabled, so repeat calls with
+the same token are served from the cache. Needs no database.
+
+Usage (from phase5/backend):
+    python -m benchmarks.auth_overhead
+"""
+import asyncio
+import os
+import statistics
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.auth import create_access_token, get_current_user
+from src.token_cache import token_cache
+
+CALLS = int(os.getenv("BENCH_CALLS", "20000"))
+# Distinct tokens in rotation, like concurrent users hitting one worker
+TOKENS = int(os.getenv("BENCH_TOKENS", "100"))
+
+
+async def measure(credentials: list) -> list:
+    """Latencies in microseconds, one per call."""
+    latencies = []
+    for i in range(CALLS):
+        start = time.perf_counter()
+        await get_current_user(credentials[i % len(credentials)])
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    return latencies
+
+
+def report(label: str, latencies: list) -> None:
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:24} mean {statistics.mean(latencies):7.2f} us   p50 {p50:7.2f} us   p99 {p99:7.2f} us")
+
+
+async def main():
+    credentials = [
+        HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token(f"bench-{i}"))
+        for i in range(TOKENS)
+    ]
+    print(f"{CALLS} calls over {TOKENS} tokens")
+    for label, enabled in (("jwt.decode every call", False), ("verified-token cache", True)):
+        token_cache.enabled = enabled
+        await measure(credentials)  # warm up
+        report(label, await measure(credentials))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
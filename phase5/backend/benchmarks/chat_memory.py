@@ -0,0 +1,107 @@
+"""
+Prompt size (and optionally latency) of chat turns: last 50 messages vs token-budgeted memory.
+
+Replays the recorded conversations in benchmarks/data/chat_conversations.jsonl.
+For every user turn it builds the prompt two ways: the old history of the
+last 50 messages, and the history that src.agent.memory.build_history keeps
+within CHAT_HISTORY_TOKEN_BUDGET. The budgeted prompt includes a summary of
+CHAT_SUMMARY_MAX_WORDS words, refreshed whenever build_history asks for one.
+Prompt tokens use the same local estimate as the budget. System prompt and
+tool definitions are included; every tool iteration of a turn resends the
+whole prompt.
+
+With BENCH_LATENCY_SAMPLES=N, N sampled turns of each kind are also sent to
+the model at LLM_BASE_URL, and their response times are compared. That
+needs a real model: the mock server's latency does not depend on prompt size.
+
+Usage (from phase5/backend):
+    python -m benchmarks.chat_memory
+"""
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from pathlib import Path
+
+from src.agent.client import DEFAULT_MODEL, _build_messages, async_client
+from src.agent.memory import HISTORY_TOKEN_BUDGET, SUMMARY_MAX_WORDS, build_history, estimate_tokens, message_tokens
+from src.mcp.server import get_mcp_tools
+from src.models import Message
+
+CORPUS = Path(__file__).parent / "data" / "chat_conversations.jsonl"
+LATENCY_SAMPLES = int(os.getenv("BENCH_LATENCY_SAMPLES", "0"))
+# Stand-in for a stored summary of the maximum length
+SUMMARY = " ".join(["summary"] * SUMMARY_MAX_WORDS)
+
+
+def history_tokens(messages: list) -> int:
+    # Everything between the system prompt and the new user message
+    return sum(message_tokens(message) for message in messages[1:-1])
+
+
+def prompt_tokens(messages: list) -> int:
+    return sum(message_tokens(message) for message in messages) + estimate_tokens(json.dumps(get_mcp_tools()))
+
+
+def replay(conversation: dict):
+    """Yield (old prompt, budgeted prompt) for every user turn."""
+    messages = [
+        Message(id=index + 1, conversation_id=conversation["id"], role=item["role"], content=item["content"])
+        for index, item in enumerate(conversation["messages"])
+    ]
+    summary, summary_message_id = None, None
+    for index, message in enumerate(messages):
+        if message.role != "user":
+            continue
+        previous = messages[:index]
+        old = [{"role": item.role, "content": item.content} for item in previous[-50:]]
+        history, summarize_before = build_history(previous, summary, summary_message_id)
+        yield _build_messages(message.content, old), _build_messages(message.content, history)
+        if summarize_before is not None:
+            # The refresh runs after the turn, so the next turn sees it
+            summary, summary_message_id = SUMMARY, summarize_before - 1
+
+
+def report(label: str, values: list, unit: str) -> None:
+    values = sorted(values)
+    p95 = values[int(len(values) * 0.95) - 1]
+    print(f"{label:22} mean {statistics.mean(values):8.1f} {unit}   p50 {statistics.median(values):8.1f} {unit}   p95 {p95:8.1f} {unit}")
+
+
+async def latency(prompts: list) -> list:
+    """Response times in milliseconds."""
+    timings = []
+    for messages in prompts:
+        start = time.perf_counter()
+        await async_client.chat.completions.create(
+            model=DEFAULT_MODEL, messages=messages, tools=get_mcp_tools(), tool_choice="auto"
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def main():
+    conversations = [json.loads(line) for line in CORPUS.read_text().splitlines() if line.strip()]
+    turns = [pair for conversation in conversations for pair in replay(conversation)]
+    print(f"{len(conversations)} conversations, {len(turns)} user turns, history budget {HISTORY_TOKEN_BUDGET} tokens")
+
+    for label, measure in (("history", history_tokens), ("whole prompt", prompt_tokens)):
+        old_tokens = [measure(old) for old, _ in turns]
+        new_tokens = [measure(new) for _, new in turns]
+        print(f"{label}:")
+        report("  last 50 messages", old_tokens, "tok")
+        report("  budget + summary", new_tokens, "tok")
+        print(f"  saved: {100 * (1 - sum(new_tokens) / sum(old_tokens)):.1f}%")
+
+    if LATENCY_SAMPLES:
+        # The longest prompts are where trimming matters
+        sample = sorted(turns, key=lambda pair: prompt_tokens(pair[0]))[-LATENCY_SAMPLES * 3:]
+        sample = random.Random(0).sample(sample, min(LATENCY_SAMPLES, len(sample)))
+        report("latency, last 50", await latency([old for old, _ in sample]), "ms")
+        report("latency, budgeted", await latency([new for _, new in sample]), "ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
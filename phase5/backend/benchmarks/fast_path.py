@@ -0,0 +1,102 @@
+"""
+Hit rate, accuracy and cost of the chat fast path (src/agent/fast_path.py).
+
+Runs parse_intent over the labelled messages in
+benchmarks/data/chat_intents.jsonl. Each message is labelled with the tool
+calls it should make, or null when it must go to the LLM. The report shows:
+- the hit rate on the corpus
+- the share of commands recognized
+- parse time
+- every mismatch
+
+A wrong match (the parser answers a message it should not, or answers it
+differently) makes the script exit with status 1. Needs no database.
+
+With BENCH_LATENCY_SAMPLES=N and BENCH_USER_ID=<user id>, N of the
+corpus's read-only messages ("show my tasks" and the like) also run through
+run_agent for that user, with and without the fast path. The second run
+needs the model at LLM_BASE_URL.
+
+Usage (from phase5/backend):
+    python -m benchmarks.fast_path
+"""
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from src.agent.client import run_agent
+from src.agent.fast_path import parse_intent
+
+CORPUS = Path(__file__).parent / "data" / "chat_intents.jsonl"
+REPEAT = int(os.getenv("BENCH_REPEAT", "200"))
+LATENCY_SAMPLES = int(os.getenv("BENCH_LATENCY_SAMPLES", "0"))
+USER_ID = os.getenv("BENCH_USER_ID")
+
+
+def parsed(message: str):
+    intent = parse_intent(message)
+    if intent is None:
+        return None
+    return {"tool": intent.tool, "arguments": list(intent.arguments)}
+
+
+def report(label: str, values: list, unit: str) -> None:
+    values = sorted(values)
+    p95 = values[int(len(values) * 0.95) - 1]
+    print(f"{label:22} mean {statistics.mean(values):8.2f} {unit}   p50 {statistics.median(values):8.2f} {unit}   p95 {p95:8.2f} {unit}")
+
+
+def latency(messages: list, fast_path: bool) -> list:
+    """Turn latencies in milliseconds."""
+    timings = []
+    for message in messages:
+        start = time.perf_counter()
+        run_agent(USER_ID, message, fast_path=fast_path)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> int:
+    corpus = [json.loads(line) for line in CORPUS.read_text().splitlines() if line.strip()]
+    commands = [item for item in corpus if item["intent"]]
+
+    wrong, missed, hits = [], [], 0
+    for item in corpus:
+        got = parsed(item["message"])
+        if got is not None:
+            hits += 1
+        if got == item["intent"]:
+            continue
+        (missed if got is None else wrong).append((item, got))
+
+    print(f"{len(corpus)} messages, {len(commands)} labelled as fast-path commands")
+    print(f"hit rate:    {100 * hits / len(corpus):5.1f}% of messages skip the LLM")
+    print(f"recall:      {100 * (len(commands) - len(missed)) / len(commands):5.1f}% of commands recognized")
+    print(f"wrong:       {len(wrong)}")
+    for item, got in wrong:
+        print(f"  WRONG  {item['message']!r}: expected {item['intent']}, got {got}")
+    for item, _ in missed:
+        print(f"  missed {item['message']!r}")
+
+    timings = []
+    for _ in range(REPEAT):
+        for item in corpus:
+            start = time.perf_counter()
+            parse_intent(item["message"])
+            timings.append((time.perf_counter() - start) * 1_000_000)
+    report("parse", timings, "us")
+
+    if LATENCY_SAMPLES and USER_ID:
+        reads = [item["message"] for item in commands if item["intent"]["tool"] == "list_tasks"]
+        sample = (reads * LATENCY_SAMPLES)[:LATENCY_SAMPLES]
+        report("turn, fast path", latency(sample, True), "ms")
+        report("turn, LLM", latency(sample, False), "ms")
+
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
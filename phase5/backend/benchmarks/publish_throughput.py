@@ -0,0 +1,129 @@
+"""
+Event publish throughput: a new HTTP client per event vs the pooled EventPublisher.
+
+A stub Dapr sidecar (answers every publish, single or bulk, with 204) runs
+on a background thread with its own event loop. Events are published
+sequentially and from BENCH_CONCURRENCY concurrent writers:
+- with a fresh httpx.AsyncClient per event, as EventPublisher used to do
+- through EventPublisher's long-lived client, one request per event
+- as one list through publish_bulk (BENCH_BATCH_SIZE events per request),
+  as the outbox relay sends a batch
+
+The stub counts the TCP connections and requests each run made. DATABASE_URL must be
+set because the models are imported, but no connection is made.
+
+Usage (from phase5/backend):
+    python -m benchmarks.publish_throughput
+"""
+import asyncio
+import os
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from src.services.event_publisher import EventPublisher
+
+EVENTS = int(os.getenv("BENCH_EVENTS", "500"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "32"))
+PORT = int(os.getenv("BENCH_SIDECAR_PORT", "3599"))
+BATCH_SIZE = int(os.getenv("BENCH_BATCH_SIZE", "100"))
+
+EVENT = {
+    "event_type": "task.updated",
+    "task_id": 1,
+    "user_id": "bench-user",
+    "title": "Benchmark task",
+    "completed": True,
+    "old_completed": False,
+    "timestamp": "2026-01-01T00:00:00",
+}
+
+# Client (host, port) pairs seen by the stub: one per TCP connection
+connections = set()
+requests = []
+
+
+async def sidecar(scope, receive, send):
+    """Minimal ASGI stand-in for the Dapr publish endpoint."""
+    if scope["type"] != "http":
+        return
+    connections.add(tuple(scope["client"]))
+    requests.append(scope["path"])
+    while (await receive()).get("more_body"):
+        pass
+    await send({"type": "http.response.start", "status": 204, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def start_sidecar() -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(
+        sidecar, host="127.0.0.1", port=PORT, lifespan="off", log_level="warning"
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+async def publish_unpooled(url: str) -> bool:
+    """The old EventPublisher._publish: a new client (and connection) per event."""
+    async with httpx.AsyncClient() as client:
+        response = await client.post(url, json=EVENT)
+        response.raise_for_status()
+        return True
+
+
+async def run(publish, concurrency: int) -> float:
+    """Events per second for EVENTS publishes by ``concurrency`` writers."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            if not await publish():
+                raise RuntimeError("publish failed")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(EVENTS)))
+    return EVENTS / (time.perf_counter() - start)
+
+
+async def main():
+    server = start_sidecar()
+    publisher = EventPublisher(max_connections=CONCURRENCY)
+    publisher.dapr_url = f"http://127.0.0.1:{PORT}"
+    bulk_publisher = EventPublisher(max_connections=CONCURRENCY, bulk=True, batch_max_events=BATCH_SIZE)
+    bulk_publisher.dapr_url = publisher.dapr_url
+    url = f"{publisher.dapr_url}/v1.0/publish/{publisher.pubsub_name}/task-events"
+
+    print(f"{EVENTS} events to a stub sidecar on port {PORT}")
+    for concurrency in (1, CONCURRENCY):
+        for label, publish in (
+            ("client per event", lambda: publish_unpooled(url)),
+            ("pooled publisher", lambda: publisher._publish("task-events", EVENT)),
+        ):
+            connections.clear()
+            requests.clear()
+            rate = await run(publish, concurrency)
+            print(
+                f"{label:18} concurrency {concurrency:3}: {rate:8.0f} events/s"
+                f"   {len(connections):5} connections   {len(requests):5} requests"
+            )
+
+    # As the outbox relay does
+    connections.clear()
+    requests.clear()
+    start = time.perf_counter()
+    errors = await bulk_publisher.publish_bulk("task-events", [EVENT] * EVENTS)
+    rate = EVENTS / (time.perf_counter() - start)
+    if any(errors):
+        raise RuntimeError("publish failed")
+    print(f"{'publish_bulk':18} one list       : {rate:8.0f} events/s   {len(connections):5} connections   {len(requests):5} requests")
+    await publisher.aclose()
+    await bulk_publisher.aclose()
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
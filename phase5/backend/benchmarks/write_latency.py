@@ -0,0 +1,117 @@
+"""
+Task write latency: SELECT + mutate + COMMIT + refresh vs UPDATE/DELETE ... RETURNING.
+
+Runs the old and new write paths of PATCH (complete a task) and DELETE
+back to back on one AsyncSession each and reports per-write latency. The
+difference is mostly round trips, so it grows with the network latency to
+the database; against a local Postgres it is a lower bound.
+
+Usage (from phase5/backend, against a disposable database):
+    DATABASE_URL=postgresql://... python -m benchmarks.write_latency
+"""
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlmodel import select
+
+from src import database
+from src.database import async_session_factory, init_db
+from src.models import Task, User
+from src.services.task_batch import update_tasks_statement, delete_tasks_statement
+
+WRITES = int(os.getenv("BENCH_WRITES", "500"))
+
+
+async def patch_before(session, user_id: str, task_id: int):
+    task = (await session.exec(
+        select(Task).where(Task.id == task_id, Task.user_id == user_id)
+    )).first()
+    old_completed = task.completed
+    task.completed = True
+    task.updated_at = datetime.now(timezone.utc)
+    session.add(task)
+    await session.commit()
+    await session.refresh(task)
+    return task, old_completed
+
+
+async def patch_after(session, user_id: str, task_id: int):
+    values = {"completed": True, "updated_at": datetime.now(timezone.utc)}
+    row = (await session.exec(update_tasks_statement(user_id, [task_id], values))).first()
+    await session.commit()
+    return row
+
+
+async def delete_before(session, user_id: str, task_id: int):
+    task = (await session.exec(
+        select(Task).where(Task.id == task_id, Task.user_id == user_id)
+    )).first()
+    await session.delete(task)
+    await session.commit()
+
+
+async def delete_after(session, user_id: str, task_id: int):
+    (await session.exec(delete_tasks_statement(user_id, [task_id]))).first()
+    await session.commit()
+
+
+async def create_tasks(user_id: str, count: int) -> list:
+    async with async_session_factory() as session:
+        tasks = [Task(user_id=user_id, title=f"bench {i}") for i in range(count)]
+        session.add_all(tasks)
+        await session.commit()
+        return [task.id for task in tasks]
+
+
+async def measure(write, user_id: str) -> list:
+    """Latencies in milliseconds, one per task."""
+    task_ids = await create_tasks(user_id, WRITES)
+    latencies = []
+    async with async_session_factory() as session:
+        for task_id in task_ids:
+            start = time.perf_counter()
+            await write(session, user_id, task_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+            # Keep the identity map from serving later reads
+            session.expunge_all()
+    return latencies
+
+
+def report(label: str, latencies: list) -> None:
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:32} mean {statistics.mean(latencies):6.2f} ms   p50 {p50:6.2f} ms   p95 {p95:6.2f} ms")
+
+
+async def main():
+    init_db()
+    user_id = f"bench-{uuid.uuid4()}"
+    async with async_session_factory() as session:
+        session.add(User(id=user_id))
+        await session.commit()
+
+    print(f"{WRITES} sequential writes each")
+    try:
+        for label, write in (
+            ("PATCH  select+commit+refresh", patch_before),
+            ("PATCH  UPDATE ... RETURNING", patch_after),
+            ("DELETE select+delete", delete_before),
+            ("DELETE DELETE ... RETURNING", delete_after),
+        ):
+            await measure(write, user_id)  # warm up
+            report(label, await measure(write, user_id))
+    finally:
+        async with async_session_factory() as session:
+            await session.exec(delete_tasks_statement(user_id, select(Task.id).where(Task.user_id == user_id)))
+            await session.delete(await session.get(User, user_id))
+            await session.commit()
+        await database.async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,5 @@
 """OpenAI Agent package for todo assistant."""
 
-from .client import run_agent
+from .client import run_agent, stream_agent
 
-__all__ = ["run_agent"]
+__all__ = ["run_agent", "stream_agent"]
@@ -2,60 +2,272 @@
 
 import os
 import json
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
 
+from .fast_path import FAST_PATH_ENABLED, Intent, fast_path_stats, parse_intent, render_reply
 from .prompts import SYSTEM_PROMPT
-from ..mcp.server import get_mcp_tools, get_tool
+from ..mcp.server import get_mcp_tools, get_tool, is_read_only
 
 # Load environment variables
 load_dotenv()
 
 # Initialize OpenAI client with Google AI (Gemini) via OpenAI compatibility
-# Using Google's Gemini model through the OpenAI-compatible API
+# Using Google's Gemini model through the OpenAI-compatible API.
+# LLM_BASE_URL points both clients elsewhere, e.g. at src/agent/mock_llm.py
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai/")
+
 client = OpenAI(
     api_key=os.getenv("GOOGLE_API_KEY"),
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
+    base_url=LLM_BASE_URL
+)
+
+# Async client for the streaming chat endpoint
+async_client = AsyncOpenAI(
+    api_key=os.getenv("GOOGLE_API_KEY"),
+    base_url=LLM_BASE_URL
 )
 
+DEFAULT_MODEL = "gemini-2.5-flash"
+MAX_ITERATIONS = 10
+
+# Tool calls of one turn run concurrently on this pool. Its size caps how
+# many tools run at once across all conversations, and so how many
+# database connections they hold; 1 runs every call sequentially.
+TOOL_CONCURRENCY = int(os.getenv("AGENT_TOOL_CONCURRENCY", "4"))
+_tool_executor = ThreadPoolExecutor(max_workers=TOOL_CONCURRENCY, thread_name_prefix="agent-tool")
+
+FALLBACK_RESPONSE = "I'm not sure how to help with that."
+MAX_ITERATIONS_RESPONSE = "I apologize, but I'm having trouble completing that request. Could you try rephrasing?"
+
+
+def _build_messages(message: str, conversation_history: Optional[List[Dict[str, str]]]) -> List[Dict[str, Any]]:
+    """System prompt, conversation history and the new user message."""
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    if conversation_history:
+        messages.extend(conversation_history)
+    messages.append({"role": "user", "content": message})
+    return messages
+
+
+def _execute_tool(user_id: str, function_name: str, arguments: str) -> Dict[str, Any]:
+    """Run one tool call for the user (blocking: tools use the sync engine)."""
+    function_args = json.loads(arguments) if arguments else {}
+    
+    # Inject user_id into function arguments (security)
+    function_args["user_id"] = user_id
+    
+    tool_function = get_tool(function_name)
+    return tool_function(**function_args)
+
+
+def _tool_groups(tool_calls: List[Dict[str, Any]]) -> List[List[List[int]]]:
+    """
+    Indexes of a turn's tool calls, as stages of independent groups.
+    
+    Stages run one after another and the groups of a stage concurrently.
+    Each run of consecutive reads, or of consecutive writes, is a stage,
+    so a read sees every write the model asked for before it and none
+    after it. Within a stage of writes, calls on the same ``task_id``
+    depend on each other (e.g. update then complete), so they share a
+    group and keep the model's order; every other call is a group of its
+    own.
+    """
+    stages: List[Dict[Any, List[int]]] = []
+    stage_reads: Optional[bool] = None
+    for index, call in enumerate(tool_calls):
+        reads = is_read_only(call["function"]["name"])
+        if reads != stage_reads:
+            stages.append({})
+            stage_reads = reads
+        try:
+            task_id = json.loads(call["function"]["arguments"] or "{}").get("task_id")
+        except (ValueError, AttributeError):
+            task_id = None
+        key = ("task", task_id) if task_id is not None and not reads else ("call", index)
+        stages[-1].setdefault(key, []).append(index)
+    return [list(groups.values()) for groups in stages]
+
+
+def _run_tool_group(
+    user_id: str, tool_calls: List[Dict[str, Any]], indexes: List[int]
+) -> List[Tuple[int, Dict[str, Any], float]]:
+    """Run one group of calls in order; returns (index, result, milliseconds) per call."""
+    outcomes = []
+    for index in indexes:
+        call = tool_calls[index]
+        started = time.perf_counter()
+        result = _execute_tool(user_id, call["function"]["name"], call["function"]["arguments"])
+        outcomes.append((index, result, (time.perf_counter() - started) * 1000))
+    return outcomes
+
+
+def _trace_entry(iteration: int, call: Dict[str, Any], duration_ms: float) -> Dict[str, Any]:
+    return {
+        "iteration": iteration,
+        "id": call["id"],
+        "name": call["function"]["name"],
+        "duration_ms": round(duration_ms, 3)
+    }
+
+
+def _tool_message(call: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "role": "tool",
+        "tool_call_id": call["id"],
+        "name": call["function"]["name"],
+        "content": json.dumps(result)
+    }
+
+
+def _execute_tool_calls(
+    user_id: str, tool_calls: List[Dict[str, Any]], iteration: int, trace: Optional[List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """Run a turn's tool calls, concurrently where independent; returns their results in call order."""
+    results: List[Optional[Dict[str, Any]]] = [None] * len(tool_calls)
+    timings: List[float] = [0.0] * len(tool_calls)
+    for stage in _tool_groups(tool_calls):
+        futures = [
+            _tool_executor.submit(_run_tool_group, user_id, tool_calls, indexes)
+            for indexes in stage
+        ]
+        for future in futures:
+            for index, result, duration_ms in future.result():
+                results[index] = result
+                timings[index] = duration_ms
+    if trace is not None:
+        trace.extend(
+            _trace_entry(iteration, call, duration_ms) for call, duration_ms in zip(tool_calls, timings)
+        )
+    return results
+
+
+def _run_tool_calls(
+    user_id: str, tool_calls: List[Dict[str, Any]], iteration: int, trace: Optional[List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """Run a turn's tool calls, concurrently where independent; returns their tool messages in call order."""
+    results = _execute_tool_calls(user_id, tool_calls, iteration, trace)
+    return [_tool_message(call, result) for call, result in zip(tool_calls, results)]
+
+
+async def _stream_tool_calls(
+    user_id: str,
+    calls: List[Dict[str, Any]],
+    iteration: int,
+    trace: Optional[List[Dict[str, Any]]],
+    results: List[Optional[Dict[str, Any]]]
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run a turn's tool calls, yielding ``tool_result`` events as they complete.
+    
+    Independent calls run concurrently (see ``_tool_groups``). Fills
+    ``results`` (one slot per call) in call order.
+    """
+    # Tools use the sync engine, so they run on the tool pool
+    timings: List[float] = [0.0] * len(calls)
+    for stage in _tool_groups(calls):
+        pending = [
+            asyncio.wrap_future(_tool_executor.submit(_run_tool_group, user_id, calls, indexes))
+            for indexes in stage
+        ]
+        for finished in asyncio.as_completed(pending):
+            for index, result, duration_ms in await finished:
+                results[index] = result
+                timings[index] = duration_ms
+                yield {
+                    "type": "tool_result",
+                    "id": calls[index]["id"],
+                    "name": calls[index]["function"]["name"],
+                    "result": result,
+                    "duration_ms": round(duration_ms, 3)
+                }
+    
+    if trace is not None:
+        trace.extend(
+            _trace_entry(iteration, call, duration_ms) for call, duration_ms in zip(calls, timings)
+        )
+
+
+def _tool_call_event(call: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "tool_call",
+        "id": call["id"],
+        "name": call["function"]["name"],
+        "arguments": call["function"]["arguments"]
+    }
+
+
+def _run_fast_path(user_id: str, intent: Intent, trace: Optional[List[Dict[str, Any]]]) -> str:
+    try:
+        results = _execute_tool_calls(user_id, intent.tool_calls(), 0, trace)
+    except Exception as e:
+        print(f"Agent error: {str(e)}")
+        return f"I apologize, but I encountered an error: {str(e)}"
+    return render_reply(intent, results)
+
 
 def run_agent(
     user_id: str,
     message: str,
     conversation_history: Optional[List[Dict[str, str]]] = None,
-    model: str = "gemini-2.5-flash"
+    model: str = DEFAULT_MODEL,
+    trace: Optional[List[Dict[str, Any]]] = None,
+    fast_path: bool = FAST_PATH_ENABLED
 ) -> str:
     """
     Run the OpenAI agent with user message and conversation history.
     
+    Simple commands ("add buy milk", "complete task 12") are recognized
+    locally and answered without calling the LLM (see fast_path.py).
+    
     Args:
         user_id: User identifier for tool authentication
         message: User's message
         conversation_history: List of previous messages [{role, content}]
         model: Model to use (default: gemini-2.5-flash via Google AI)
+        trace: Optional list that receives one entry per tool call
+            ({iteration, id, name, duration_ms}), in call order;
+            iteration 0 means the fast path ran the call
+        fast_path: Whether simple commands may skip the LLM
     
     Returns:
         Assistant's response string
     """
-    # Prepare messages
-    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    started = time.perf_counter()
+    intent = parse_intent(message) if fast_path else None
+    if intent is not None:
+        reply = _run_fast_path(user_id, intent, trace)
+        fast_path_stats.record_hit(intent.tool, time.perf_counter() - started)
+        return reply
     
-    # Add conversation history
-    if conversation_history:
-        messages.extend(conversation_history)
-    
-    # Add current user message
-    messages.append({"role": "user", "content": message})
+    try:
+        return _run_llm_agent(user_id, message, conversation_history, model, trace)
+    finally:
+        fast_path_stats.record_miss(time.perf_counter() - started)
+
+
+def _run_llm_agent(
+    user_id: str,
+    message: str,
+    conversation_history: Optional[List[Dict[str, str]]],
+    model: str,
+    trace: Optional[List[Dict[str, Any]]]
+) -> str:
+    """The agent loop of ``run_agent``: LLM turns and tool calls until a text reply."""
+    # Prepare messages
+    messages = _build_messages(message, conversation_history)
     
     # Get tools
     tools = get_mcp_tools()
     
     # Run agent with tool calling
-    max_iterations = 10
     iteration = 0
     
-    while iteration < max_iterations:
+    while iteration < MAX_ITERATIONS:
         iteration += 1
         
         try:
@@ -71,45 +283,31 @@ def run_agent(
             
             # Check if agent wants to call tools
             if assistant_message.tool_calls:
+                tool_calls = [
+                    {
+                        "id": tc.id,
+                        "type": tc.type,
+                        "function": {
+                            "name": tc.function.name,
+                            "arguments": tc.function.arguments
+                        }
+                    }
+                    for tc in assistant_message.tool_calls
+                ]
+                
                 # Add assistant message to history
                 messages.append({
                     "role": "assistant",
                     "content": assistant_message.content or "",
-                    "tool_calls": [
-                        {
-                            "id": tc.id,
-                            "type": tc.type,
-                            "function": {
-                                "name": tc.function.name,
-                                "arguments": tc.function.arguments
-                            }
-                        }
-                        for tc in assistant_message.tool_calls
-                    ]
+                    "tool_calls": tool_calls
                 })
                 
-                # Execute each tool call
-                for tool_call in assistant_message.tool_calls:
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    
-                    # Inject user_id into function arguments (security)
-                    function_args["user_id"] = user_id
-                    
-                    # Get and execute the tool
-                    tool_function = get_tool(function_name)
-                    result = tool_function(**function_args)
-                    
-                    # Add tool response to messages
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "name": function_name,
-                        "content": json.dumps(result)
-                    })
+                # Execute the tool calls (concurrently); the API expects
+                # the tool responses in the order of the calls
+                messages.extend(_run_tool_calls(user_id, tool_calls, iteration, trace))
             else:
                 # No more tool calls, return final response
-                return assistant_message.content or "I'm not sure how to help with that."
+                return assistant_message.content or FALLBACK_RESPONSE
         
         except Exception as e:
             # Log error and return friendly message
@@ -117,5 +315,128 @@ def run_agent(
             return f"I apologize, but I encountered an error: {str(e)}"
     
     # Max iterations reached
-    return "I apologize, but I'm having trouble completing that request. Could you try rephrasing?"
+    return MAX_ITERATIONS_RESPONSE
+
+
+async def stream_agent(
+    user_id: str,
+    message: str,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    model: str = DEFAULT_MODEL,
+    trace: Optional[List[Dict[str, Any]]] = None,
+    fast_path: bool = FAST_PATH_ENABLED
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of ``run_agent``.
+    
+    Yields events as they happen:
+        {"type": "token", "content": ...}                    assistant text delta
+        {"type": "tool_call", "id", "name", "arguments"}     before a tool runs
+        {"type": "tool_result", "id", "name", "result", "duration_ms"}
+                                                             after it returns
+        {"type": "error", "detail": ...}                     the agent failed
+        {"type": "done", "content": ...}                     always last
+    
+    The ``done`` content is the final assistant reply (the text of the last
+    turn, or an apology), which is what ``run_agent`` would have returned.
+    A turn's tool calls run concurrently, so their results are reported as
+    they complete, which need not be call order.
+    
+    Commands the fast path recognizes produce the same events, with the
+    templated reply as a single ``token``.
+    """
+    started = time.perf_counter()
+    intent = parse_intent(message) if fast_path else None
+    if intent is None:
+        async for event in _stream_llm_agent(user_id, message, conversation_history, model, trace):
+            if event["type"] == "done":
+                fast_path_stats.record_miss(time.perf_counter() - started)
+            yield event
+        return
+    
+    calls = intent.tool_calls()
+    for call in calls:
+        yield _tool_call_event(call)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+    try:
+        async for event in _stream_tool_calls(user_id, calls, 0, trace, results):
+            yield event
+    except Exception as e:
+        print(f"Agent error: {str(e)}")
+        yield {"type": "error", "detail": str(e)}
+        yield {"type": "done", "content": f"I apologize, but I encountered an error: {str(e)}"}
+        return
+    reply = render_reply(intent, results)
+    fast_path_stats.record_hit(intent.tool, time.perf_counter() - started)
+    yield {"type": "token", "content": reply}
+    yield {"type": "done", "content": reply}
+
+
+async def _stream_llm_agent(
+    user_id: str,
+    message: str,
+    conversation_history: Optional[List[Dict[str, str]]],
+    model: str,
+    trace: Optional[List[Dict[str, Any]]]
+) -> AsyncIterator[Dict[str, Any]]:
+    """The agent loop of ``stream_agent``."""
+    messages = _build_messages(message, conversation_history)
+    tools = get_mcp_tools()
+    
+    for iteration in range(1, MAX_ITERATIONS + 1):
+        try:
+            stream = await async_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                tools=tools,
+                tool_choice="auto",
+                stream=True
+            )
+            
+            content_parts = []
+            # Tool calls arrive in fragments, keyed by their index
+            tool_calls: Dict[int, Dict[str, Any]] = {}
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content_parts.append(delta.content)
+                    yield {"type": "token", "content": delta.content}
+                for fragment in delta.tool_calls or []:
+                    index = fragment.index if fragment.index is not None else len(tool_calls)
+                    call = tool_calls.setdefault(index, {
+                        "id": None,
+                        "type": "function",
+                        "function": {"name": "", "arguments": ""}
+                    })
+                    if fragment.id:
+                        call["id"] = fragment.id
+                    if fragment.function is not None:
+                        call["function"]["name"] += fragment.function.name or ""
+                        call["function"]["arguments"] += fragment.function.arguments or ""
+            
+            content = "".join(content_parts)
+            if not tool_calls:
+                yield {"type": "done", "content": content or FALLBACK_RESPONSE}
+                return
+            
+            calls = [tool_calls[index] for index in sorted(tool_calls)]
+            messages.append({"role": "assistant", "content": content, "tool_calls": calls})
+            
+            for call in calls:
+                yield _tool_call_event(call)
+            
+            results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+            async for event in _stream_tool_calls(user_id, calls, iteration, trace, results):
+                yield event
+            messages.extend(_tool_message(call, result) for call, result in zip(calls, results))
+        
+        except Exception as e:
+            print(f"Agent error: {str(e)}")
+            yield {"type": "error", "detail": str(e)}
+            yield {"type": "done", "content": f"I apologize, but I encountered an error: {str(e)}"}
+            return
+    
+    yield {"type": "done", "content": MAX_ITERATIONS_RESPONSE}
 
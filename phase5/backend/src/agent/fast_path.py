@@ -0,0 +1,268 @@
+"""
+Deterministic fast path: simple, unambiguous commands are answered without the LLM.
+
+``parse_intent`` recognizes a handful of command shapes ("add buy milk",
+"complete task 12", "delete tasks 3 and 4", "show my pending tasks").
+A match runs the same tools the agent would call and ``render_reply`` turns
+their results into a templated reply. Anything the patterns do not cover
+with certainty goes to the LLM as before:
+- due dates, priorities, tags, several tasks in one message
+- tasks referred to by name or pronoun, or by a bare number ("delete 2")
+- questions
+
+The patterns favour precision over recall: a miss costs an LLM call, a
+wrong match does the wrong thing. benchmarks/data/chat_intents.jsonl holds
+labelled messages; ``python -m benchmarks.fast_path`` checks the parser
+against them.
+"""
+
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..metrics import LatencyStats
+
+# CHAT_FAST_PATH=false sends every message to the LLM
+FAST_PATH_ENABLED = os.getenv("CHAT_FAST_PATH", "true").lower() not in ("0", "false", "no", "off")
+
+_STATUSES = {
+    "pending": "pending", "open": "pending", "incomplete": "pending", "unfinished": "pending",
+    "outstanding": "pending", "remaining": "pending", "active": "pending", "undone": "pending",
+    "completed": "completed", "complete": "completed", "done": "completed", "finished": "completed",
+}
+_STATUS = "(?P<status>" + "|".join(_STATUSES) + ")"
+_LIST_NOUN = r"(?:tasks|todos|to-dos|items|todo list|to-do list|list)"
+# One task id: "12", "#12", "task 12", "task id 12"
+_ID = r"(?:tasks?\s+)?(?:(?:id|number|no\.?)\s*)?#?\d+"
+# The first id of a command must say it is one ("task 12", "#12", "id 12"):
+# a bare "delete 2" may answer a question ("which of these 3?") or mean
+# the second task in a list the model showed, not task 2
+_KEYWORD_ID = r"(?:tasks?\s+(?:(?:id|number|no\.?)\s*)?#?|(?:id|number)\s*#?|#)\d+"
+# Several ids: "tasks 3, 4 and 5", "#3 & 4", "task 4 and task 5"
+_IDS = rf"(?P<ids>{_KEYWORD_ID}(?:(?:\s*,\s*(?:and\s+)?|\s+and\s+|\s*&\s*){_ID})*)"
+_DONE = r"(?:done|complete|completed|finished)"
+
+_ADD_PATTERNS = [
+    re.compile(
+        r"(?:add|create)(?:\s+(?:a|an))?(?:\s+new)?(?:\s+(?:task|todo|to-do|item))?"
+        rf"(?:\s+to\s+(?:my\s+)?{_LIST_NOUN})?\s*[:\-]?\s+(?P<title>.+?)"
+        rf"(?:\s+to\s+(?:my\s+)?{_LIST_NOUN})?",
+        re.IGNORECASE
+    ),
+    re.compile(r"new\s+(?:task|todo|to-do)\s*[:\-]?\s+(?P<title>.+)", re.IGNORECASE),
+    re.compile(r"(?:task|todo|to-do)\s*:\s*(?P<title>.+)", re.IGNORECASE),
+]
+_LIST_PATTERNS = [
+    re.compile(
+        rf"(?:show|list|display|view|see|get)(?:\s+me)?(?:\s+all)?(?:\s+of)?(?:\s+(?:my|the))?"
+        rf"(?:\s+{_STATUS})?\s+{_LIST_NOUN}",
+        re.IGNORECASE
+    ),
+    re.compile(
+        rf"what(?:'s|\s+is|\s+are)(?:\s+all)?(?:\s+on)?\s+(?:my|the)(?:\s+{_STATUS})?\s+{_LIST_NOUN}",
+        re.IGNORECASE
+    ),
+    re.compile(rf"(?:(?:all\s+)?my\s+|all\s+)?(?:{_STATUS}\s+)?(?:tasks|todos|to-dos)", re.IGNORECASE),
+    re.compile(rf"list(?:\s+all)?(?:\s+{_STATUS})?", re.IGNORECASE),
+]
+_COMPLETE_PATTERNS = [
+    re.compile(rf"(?:complete|finish|close|(?:check|tick|cross)\s+off)\s+{_IDS}", re.IGNORECASE),
+    re.compile(rf"mark\s+{_IDS}(?:\s+as)?\s+{_DONE}", re.IGNORECASE),
+    re.compile(rf"(?=tasks?\s){_IDS}\s+(?:is|are)\s+{_DONE}", re.IGNORECASE),
+    re.compile(
+        rf"(?:i(?:'ve|\s+have)?\s+)?(?:finished|completed|done\s+with)\s+(?=tasks?\s){_IDS}",
+        re.IGNORECASE
+    ),
+]
+_DELETE_PATTERNS = [
+    re.compile(rf"(?:delete|remove|erase|drop|get\s+rid\s+of)\s+{_IDS}", re.IGNORECASE),
+]
+
+_POLITE_PREFIX = re.compile(
+    r"^(?:(?:please|pls|kindly|ok|okay|hey|can\s+you|could\s+you|would\s+you|will\s+you)[,\s]+)+",
+    re.IGNORECASE
+)
+_POLITE_SUFFIX = re.compile(r"(?:[,\s]+(?:please|pls))+$", re.IGNORECASE)
+_TRAILING_PUNCTUATION = re.compile(r"[\s.!?]+$")
+_QUOTES = "\"'“”‘’`"
+
+# Titles with these are left to the LLM: it may need to set a due date,
+# priority or tags, split the message into several tasks, or resolve a
+# reference to an earlier message
+_AMBIGUOUS_TITLE = re.compile(
+    r"[,;:#\n]"
+    r"|\b(?:and|then|also|plus)\b"
+    r"|\b(?:today|tonight|tomorrow|yesterday|weekend|morning|afternoon|evening|noon|midnight)\b"
+    r"|\b(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)s?\b"
+    r"|\b(?:january|february|march|april|may|june|july|august|september|october|november|december)\b"
+    r"|\b(?:next|every|each|daily|weekly|monthly|yearly|due|by|until|before|deadline)\b"
+    r"|\b(?:minutes?|mins?|hours?|hrs?|days?|weeks?|months?|years?)\b"
+    r"|\b(?:at|on|in)\s+\d|\d\s*(?:am|pm)\b|\d{1,2}[:/]\d{1,2}"
+    r"|\b(?:priority|urgent|important|asap|critical)\b"
+    r"|\b(?:tags?|tagged|label(?:led)?)\b"
+    r"|\b(?:remind|reminder)\b|\btasks?\s*#?\d",
+    re.IGNORECASE
+)
+# First words that make the title a reference or a placeholder, not a title
+_VAGUE_WORDS = {
+    "a", "an", "it", "that", "this", "them", "those", "these", "something", "anything",
+    "one", "another", "task", "tasks", "todo", "new", "to", "more", "some",
+}
+
+
+@dataclass(frozen=True)
+class Intent:
+    """A recognized command: one tool, called once per set of arguments."""
+    tool: str
+    arguments: Tuple[Dict[str, Any], ...]
+
+    def tool_calls(self) -> List[Dict[str, Any]]:
+        """The calls in OpenAI tool-call format, as the agent would have made them."""
+        return [
+            {
+                "id": f"fastpath_{index}",
+                "type": "function",
+                "function": {"name": self.tool, "arguments": json.dumps(arguments)}
+            }
+            for index, arguments in enumerate(self.arguments, 1)
+        ]
+
+
+def _normalize(message: str) -> str:
+    text = " ".join(message.replace("’", "'").split())
+    text = _TRAILING_PUNCTUATION.sub("", text)
+    text = _POLITE_SUFFIX.sub("", text)
+    text = _POLITE_PREFIX.sub("", text)
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+def _clean_title(title: str) -> Optional[str]:
+    """The task title, or None when it is not certain to be one."""
+    title = title.strip()
+    quoted = len(title) >= 2 and title[0] in _QUOTES and title[-1] in _QUOTES
+    if quoted:
+        # Quotes mark the exact title, whatever it contains
+        title = title[1:-1].strip()
+    elif _AMBIGUOUS_TITLE.search(title) or title.split()[0].lower() in _VAGUE_WORDS:
+        return None
+    if not any(char.isalnum() for char in title) or len(title) > 200:
+        return None
+    return title[0].upper() + title[1:]
+
+
+def _task_ids(text: str) -> Tuple[Dict[str, Any], ...]:
+    ids = dict.fromkeys(int(task_id) for task_id in re.findall(r"\d+", text))
+    return tuple({"task_id": task_id} for task_id in ids)
+
+
+def parse_intent(message: str) -> Optional[Intent]:
+    """The command in a chat message, or None when the LLM should handle it."""
+    text = _normalize(message)
+    if not text or len(text) > 300:
+        return None
+
+    for pattern in _ADD_PATTERNS:
+        match = pattern.fullmatch(text)
+        if match:
+            title = _clean_title(match.group("title"))
+            return Intent("add_task", ({"title": title},)) if title else None
+    for pattern in _LIST_PATTERNS:
+        match = pattern.fullmatch(text)
+        if match:
+            status = _STATUSES.get((match.group("status") or "").lower(), "all")
+            return Intent("list_tasks", ({"status": status},))
+    for tool, patterns in (("complete_task", _COMPLETE_PATTERNS), ("delete_task", _DELETE_PATTERNS)):
+        for pattern in patterns:
+            match = pattern.fullmatch(text)
+            if match:
+                return Intent(tool, _task_ids(match.group("ids")))
+    return None
+
+
+def _render_tasks(arguments: Dict[str, Any], result: Dict[str, Any]) -> str:
+    if not result.get("success"):
+        return f"Sorry, I couldn't load your tasks: {result.get('error')}"
+    status = arguments.get("status", "all")
+    label = "" if status == "all" else f"{status} "
+    total = result["total"]
+    if not total:
+        return f"You don't have any {label}tasks."
+
+    lines = [f"You have {total} {label}task{'s' if total != 1 else ''}:"]
+    columns = result["columns"]
+    for row in result["rows"]:
+        task = dict(zip(columns, row))
+        details = [f"ID {task['id']}"]
+        if task.get("priority") == "high":
+            details.append("high priority")
+        if task.get("due_date"):
+            details.append(f"due {task['due_date'][:10]}")
+        mark = "x" if task.get("completed") else " "
+        lines.append(f"- [{mark}] {task['title']} ({', '.join(details)})")
+    if total > result["count"] + result["offset"]:
+        lines.append(f"...and {total - result['count'] - result['offset']} more.")
+    return "\n".join(lines)
+
+
+_SUCCESS_TEMPLATES = {
+    "add_task": "Added '{title}' to your tasks (ID {task_id}).",
+    "complete_task": "Marked '{title}' as completed.",
+    "delete_task": "{message}.",
+}
+
+
+def render_reply(intent: Intent, results: Sequence[Dict[str, Any]]) -> str:
+    """The assistant reply for an intent, from its tool results in call order."""
+    if intent.tool == "list_tasks":
+        return _render_tasks(intent.arguments[0], results[0])
+
+    done = [_SUCCESS_TEMPLATES[intent.tool].format(**result) for result in results if result.get("success")]
+    failed = [f"{result.get('error')}." for result in results if not result.get("success")]
+    if done and intent.tool == "complete_task":
+        done.append("Nice work!")
+    return " ".join(done + failed)
+
+
+class FastPathStats:
+    """Thread-safe hit and miss counts, and turn latency on each path."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses = 0
+        self.fast_latency = LatencyStats()
+        self.llm_latency = LatencyStats()
+
+    def record_hit(self, tool: str, seconds: float) -> None:
+        with self._lock:
+            self.hits[tool] = self.hits.get(tool, 0) + 1
+        self.fast_latency.record(seconds)
+
+    def record_miss(self, seconds: float) -> None:
+        with self._lock:
+            self.misses += 1
+        self.llm_latency.record(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Turns answered on each path, the hit rate, and their latency."""
+        with self._lock:
+            hits, misses = dict(self.hits), self.misses
+        hit_count = sum(hits.values())
+        turns = hit_count + misses
+        return {
+            "enabled": FAST_PATH_ENABLED,
+            "turns": turns,
+            "hits": hit_count,
+            "misses": misses,
+            "hit_rate": round(hit_count / turns, 3) if turns else 0.0,
+            "hits_by_tool": hits,
+            **self.fast_latency.snapshot("fast_"),
+            **self.llm_latency.snapshot("llm_"),
+        }
+
+
+# Singleton instance
+fast_path_stats = FastPathStats()
@@ -0,0 +1,177 @@
+"""Conversation memory: recent turns within a token budget, plus a rolling summary."""
+
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlmodel import select
+
+from .client import async_client, DEFAULT_MODEL
+from .prompts import SUMMARY_CONTEXT, SUMMARY_PROMPT
+from ..database import async_session_factory
+from ..models import Conversation, Message
+
+# Prompt tokens the history (and summary) may use on each LLM call
+HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1000"))
+# Messages loaded per turn; well above what usually fits the budget
+HISTORY_MAX_MESSAGES = 200
+# Length the summary is asked to stay under
+SUMMARY_MAX_WORDS = int(os.getenv("CHAT_SUMMARY_MAX_WORDS", "150"))
+# Transcript tokens sent per summarization call; longer backlogs are folded in steps
+SUMMARY_INPUT_TOKENS = 4000
+# Role and separator tokens the chat format adds around each message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Conversations with a summary refresh running in this process
+_refreshing: Set[str] = set()
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Approximate BPE token count, without a model-specific tokenizer.
+
+    Words count one token per four characters (rounded up) and every other
+    symbol one token. That is close enough to GPT and Gemini tokenizers on
+    English chat text for budgeting.
+    """
+    if not text:
+        return 0
+    count = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        count += (len(piece) + 3) // 4 if piece[0].isalnum() or piece[0] == "_" else 1
+    return count
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    """Estimated prompt tokens of one chat message."""
+    return MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message.get("content"))
+
+
+def build_history(
+    messages: Sequence[Message],
+    summary: Optional[str] = None,
+    summary_message_id: Optional[int] = None,
+    budget: int = HISTORY_TOKEN_BUDGET
+) -> Tuple[List[Dict[str, str]], Optional[int]]:
+    """
+    Agent history for a turn, from the conversation's messages in chronological order.
+
+    The newest messages that fit ``budget`` are kept; the latest one always
+    is. When older messages are left out, the stored summary stands in for
+    them as a system message, and its tokens count against the budget.
+
+    Returns the history and, when left-out messages are not covered by the
+    summary yet, the id of the oldest kept message: everything before it
+    should be folded into the summary (see ``refresh_summary``).
+    """
+    summary_message = {"role": "system", "content": SUMMARY_CONTEXT.format(summary=summary)} if summary else None
+    remaining = budget - (message_tokens(summary_message) if summary_message else 0)
+
+    kept: List[Message] = []
+    for message in reversed(messages):
+        cost = message_tokens({"content": message.content})
+        if kept and cost > remaining:
+            break
+        kept.append(message)
+        remaining -= cost
+    kept.reverse()
+
+    history = [{"role": message.role, "content": message.content} for message in kept]
+    dropped = messages[:len(messages) - len(kept)]
+    if not dropped:
+        return history, None
+
+    if summary_message:
+        history.insert(0, summary_message)
+    if summary_message_id is not None and dropped[-1].id <= summary_message_id:
+        return history, None
+    return history, kept[0].id if kept else None
+
+
+def _transcript(messages: Sequence[Message]) -> str:
+    return "\n".join(f"{message.role}: {message.content}" for message in messages)
+
+
+def _chunks(messages: Sequence[Message]) -> List[List[Message]]:
+    """Split messages into runs of at most ``SUMMARY_INPUT_TOKENS``."""
+    chunks: List[List[Message]] = [[]]
+    used = 0
+    for message in messages:
+        cost = message_tokens({"content": message.content})
+        if chunks[-1] and used + cost > SUMMARY_INPUT_TOKENS:
+            chunks.append([])
+            used = 0
+        chunks[-1].append(message)
+        used += cost
+    return chunks
+
+
+async def summarize(summary: Optional[str], messages: Sequence[Message]) -> str:
+    """Fold messages into a summary with the LLM."""
+    for chunk in _chunks(messages):
+        response = await async_client.chat.completions.create(
+            model=DEFAULT_MODEL,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT.format(max_words=SUMMARY_MAX_WORDS)},
+                {
+                    "role": "user",
+                    "content": f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{_transcript(chunk)}"
+                }
+            ]
+        )
+        summary = (response.choices[0].message.content or "").strip() or summary
+    return summary or ""
+
+
+async def refresh_summary(conversation_id: str, before_message_id: int) -> None:
+    """
+    Fold every message older than ``before_message_id`` into the conversation summary.
+
+    Runs after the response has been sent. Only one refresh per
+    conversation runs at a time in a process, and the summary is only
+    replaced if no other process advanced it meanwhile. Failures are
+    logged; the next turn tries again.
+    """
+    if conversation_id in _refreshing:
+        return
+    _refreshing.add(conversation_id)
+    try:
+        async with async_session_factory() as session:
+            conversation = await session.get(Conversation, conversation_id)
+            if conversation is None:
+                return
+            covered = conversation.summary_message_id
+            query = select(Message).where(
+                Message.conversation_id == conversation_id,
+                Message.id < before_message_id
+            )
+            if covered is not None:
+                query = query.where(Message.id > covered)
+            messages = (await session.exec(query.order_by(Message.id))).all()
+            if not messages:
+                return
+            # Don't hold the transaction open during the LLM call
+            await session.commit()
+
+            summary = await summarize(conversation.summary, messages)
+
+            # Re-read under a lock: another worker may have refreshed meanwhile
+            conversation = (await session.exec(
+                select(Conversation)
+                .where(Conversation.id == conversation_id)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            )).first()
+            if conversation is None or conversation.summary_message_id != covered:
+                await session.rollback()
+                return
+            conversation.summary = summary
+            conversation.summary_message_id = messages[-1].id
+            session.add(conversation)
+            await session.commit()
+    except Exception as e:
+        print(f"Failed to refresh summary of conversation {conversation_id}: {e}")
+    finally:
+        _refreshing.discard(conversation_id)
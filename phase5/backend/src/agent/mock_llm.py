@@ -0,0 +1,191 @@
+"""
+Scripted OpenAI-compatible chat completions server, for running the agent offline.
+
+Implements just enough of ``POST /v1/chat/completions`` (streaming and
+non-streaming, with tool calls) for ``run_agent`` and ``stream_agent``.
+Replies are deterministic and picked from the last user message:
+
+    "add <title>"              add_task(title)
+    "list ..." / "show ..."    list_tasks(status="all")
+    "find <words>"             find_task(query)
+    "complete <id>[, <id>...]" one complete_task call per id, in one turn
+    "delete <id>[, <id>...]"   one delete_task call per id, in one turn
+    anything else              a plain text reply
+
+Once the tool results are in, it answers with a summary of them.
+Conversation summary requests (see src/agent/memory.py) get the previous
+summary plus the user's messages, abridged.
+
+Usage (from phase5/backend):
+    uvicorn src.agent.mock_llm:app --port 8001
+    LLM_BASE_URL=http://localhost:8001/v1 uvicorn src.main:app
+
+MOCK_LLM_DELAY_MS sets the pause between streamed chunks (default 20).
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI(title="Mock LLM")
+
+CHUNK_DELAY = float(os.getenv("MOCK_LLM_DELAY_MS", "20")) / 1000
+
+
+def _plan_tool_calls(text: str) -> List[Dict[str, Any]]:
+    """Tool calls the scripted model makes for a user message."""
+    text = text.strip()
+    lowered = text.lower()
+    if lowered.startswith("add "):
+        return [{"name": "add_task", "arguments": {"title": text[4:].strip()}}]
+    if lowered.startswith(("list", "show")):
+        return [{"name": "list_tasks", "arguments": {"status": "all"}}]
+    if lowered.startswith("find "):
+        return [{"name": "find_task", "arguments": {"query": text[5:].strip()}}]
+    for verb, tool in (("complete", "complete_task"), ("delete", "delete_task")):
+        if lowered.startswith(verb):
+            return [
+                {"name": tool, "arguments": {"task_id": int(task_id)}}
+                for task_id in re.findall(r"\d+", text)
+            ]
+    return []
+
+
+def _summarize(results: List[str]) -> str:
+    parts = []
+    for content in results:
+        try:
+            result = json.loads(content)
+        except ValueError:
+            result = {}
+        if isinstance(result, dict) and result.get("message"):
+            parts.append(result["message"])
+        elif isinstance(result, dict) and "rows" in result:
+            title = result["columns"].index("title") if "title" in result["columns"] else 0
+            titles = ", ".join(str(row[title]) for row in result["rows"]) or "nothing"
+            parts.append(f"You have {result['total']} tasks: {titles}.")
+        elif isinstance(result, dict) and "matches" in result:
+            found = ", ".join(f"{match['title']} (ID {match['id']})" for match in result["matches"])
+            parts.append(f"Best matches: {found}." if found else "No matching tasks.")
+        elif isinstance(result, dict) and result.get("error"):
+            parts.append(f"That didn't work: {result['error']}")
+        else:
+            parts.append("Done.")
+    return " ".join(parts)
+
+
+def _conversation_summary(request: str) -> str:
+    previous, _, transcript = request.partition("New messages:")
+    previous = previous.replace("Current summary:", "").strip()
+    asked = [
+        " ".join(line[len("user:"):].split()[:8])
+        for line in transcript.splitlines() if line.startswith("user:")
+    ]
+    parts = [] if previous in ("", "(none)") else [previous]
+    if asked:
+        parts.append("The user asked: " + "; ".join(asked) + ".")
+    return " ".join(parts)
+
+
+def _reply(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The assistant message for this turn: tool calls or text."""
+    if messages and messages[0].get("role") == "system" and "running summary" in (messages[0].get("content") or ""):
+        return {"role": "assistant", "content": _conversation_summary(messages[-1].get("content") or "")}
+
+    # Trailing tool results mean the tools of the previous turn already ran
+    tool_results = []
+    for message in reversed(messages):
+        if message.get("role") != "tool":
+            break
+        tool_results.insert(0, message.get("content") or "")
+    if tool_results:
+        return {"role": "assistant", "content": _summarize(tool_results)}
+
+    user_text = next(
+        (message.get("content") or "" for message in reversed(messages) if message.get("role") == "user"),
+        ""
+    )
+    calls = _plan_tool_calls(user_text)
+    if not calls:
+        return {"role": "assistant", "content": f"You said: {user_text}. How can I help with your tasks?"}
+    return {
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [
+            {
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])},
+            }
+            for call in calls
+        ],
+    }
+
+
+def _chunk(completion_id: str, model: str, delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+    chunk = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+async def _stream(completion_id: str, model: str, reply: Dict[str, Any]):
+    yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+    if reply.get("tool_calls"):
+        for index, call in enumerate(reply["tool_calls"]):
+            await asyncio.sleep(CHUNK_DELAY)
+            yield _chunk(completion_id, model, {"tool_calls": [{
+                "index": index,
+                "id": call["id"],
+                "type": "function",
+                "function": {"name": call["function"]["name"], "arguments": ""},
+            }]})
+            # Arguments arrive in fragments, as with real models
+            arguments = call["function"]["arguments"]
+            for start in range(0, len(arguments), 8):
+                yield _chunk(completion_id, model, {"tool_calls": [{
+                    "index": index,
+                    "function": {"arguments": arguments[start:start + 8]},
+                }]})
+        yield _chunk(completion_id, model, {}, "tool_calls")
+    else:
+        for word in re.findall(r"\S+\s*", reply["content"]):
+            await asyncio.sleep(CHUNK_DELAY)
+            yield _chunk(completion_id, model, {"content": word})
+        yield _chunk(completion_id, model, {}, "stop")
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "mock")
+    reply = _reply(body.get("messages", []))
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+    if body.get("stream"):
+        return StreamingResponse(_stream(completion_id, model, reply), media_type="text/event-stream")
+
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": reply,
+            "finish_reason": "tool_calls" if reply.get("tool_calls") else "stop",
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
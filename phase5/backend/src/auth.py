@@ -1,5 +1,4 @@
 import os
-import bcrypt
 import jwt
 from datetime import datetime, timedelta, timezone
 from typing import Optional
@@ -7,6 +6,9 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 
+from .passwords import password_hasher
+from .token_cache import token_cache, token_hash
+
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
 
@@ -20,20 +22,12 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 security = HTTPBearer()
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    """Hash a password using bcrypt (blocking; async code uses password_hasher.hash)."""
+    return password_hasher.hash_sync(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    try:
-        return bcrypt.checkpw(
-            plain_password.encode('utf-8'), 
-            hashed_password.encode('utf-8')
-        )
-    except Exception:
-        return False
+    """Verify a password against its hash (blocking; async code uses password_hasher.verify)."""
+    return password_hasher.verify_sync(plain_password, hashed_password)
 
 def create_access_token(user_id: str, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
@@ -51,19 +45,28 @@ def create_access_token(user_id: str, expires_delta: Optional[timedelta] = None)
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str) -> Optional[str]:
-    """Verify a JWT token and return the user_id if valid."""
+def decode_token(token: str) -> Optional[dict]:
+    """Verify a JWT token's signature and expiry and return its claims."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            return None
-        return user_id
     except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
         return None
+    if payload.get("sub") is None:
+        return None
+    return payload
+
+def verify_token(token: str) -> Optional[str]:
+    """Verify a JWT token and return the user_id if valid."""
+    payload = decode_token(token)
+    return payload["sub"] if payload is not None else None
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
-    """FastAPI dependency to get the current authenticated user's ID."""
+    """
+    FastAPI dependency to get the current authenticated user's ID.
+
+    Verified tokens are cached until they expire, so repeated requests with
+    the same token skip the signature check; revoked tokens are rejected.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -71,9 +74,18 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     )
     
     token = credentials.credentials
-    user_id = verify_token(token)
+    digest = token_hash(token)
+    user_id = token_cache.get(digest)
+    if user_id is not None:
+        return user_id
     
-    if user_id is None:
+    payload = decode_token(token)
+    if payload is None or token_cache.is_revoked(digest):
         raise credentials_exception
     
+    user_id = payload["sub"]
+    # Tokens without an expiry are verified every time
+    if "exp" in payload:
+        token_cache.put(digest, user_id, payload["exp"])
+    
     return user_id
@@ -0,0 +1,115 @@
+"""Data versions served as ETags: per-user for lists, per-row for tasks."""
+
+import hashlib
+from typing import List, Optional
+
+from fastapi import Response, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .models import UserDataVersion
+
+# Tables whose writes change what a user's list endpoints return
+VERSIONED_TABLES = ("tasks", "conversations")
+
+# Statement-level triggers keep user_data_versions current for every write
+# path (API, MCP tools, processors), bumping each affected user once per
+# statement inside the writing transaction
+DATA_VERSION_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION bump_user_data_version() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO user_data_versions (user_id, version)
+            SELECT DISTINCT user_id, 1 FROM old_rows
+            ON CONFLICT (user_id) DO UPDATE SET version = user_data_versions.version + 1;
+        ELSE
+            INSERT INTO user_data_versions (user_id, version)
+            SELECT DISTINCT user_id, 1 FROM new_rows
+            ON CONFLICT (user_id) DO UPDATE SET version = user_data_versions.version + 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+] + [
+    f"""
+    CREATE OR REPLACE TRIGGER {table}_{operation.lower()}_data_version
+    AFTER {operation} ON {table}
+    REFERENCING {"OLD" if operation == "DELETE" else "NEW"} TABLE AS {"old_rows" if operation == "DELETE" else "new_rows"}
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_user_data_version()
+    """
+    for table in VERSIONED_TABLES
+    for operation in ("INSERT", "UPDATE", "DELETE")
+]
+
+
+async def get_data_version(session: AsyncSession, user_id: str) -> int:
+    """Current data version of a user; 0 until their first write."""
+    version = (await session.exec(
+        select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+    )).first()
+    return version or 0
+
+
+def _user_tag(user_id: str) -> str:
+    return hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:16]
+
+
+def make_etag(kind: str, user_id: str, version: int) -> str:
+    """
+    Strong ETag for ``kind`` (a user's list, or one task) at the given version.
+
+    Versions are per user, so two users can be at the same one; the hashed
+    user id keeps one user's ETag from validating another user's response.
+    """
+    return f'"{kind}-{_user_tag(user_id)}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches ``etag`` (weak comparison, per RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def if_match_versions(if_match: Optional[str], kind: str, user_id: str) -> Optional[List[int]]:
+    """
+    Versions of ``kind`` accepted by an If-Match header, or None for no condition.
+
+    If-Match uses strong comparison, so weak tags never match, nor do tags
+    made for another user.
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    prefix = f'"{kind}-{_user_tag(user_id)}-'
+    versions = []
+    for candidate in if_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith(prefix) and candidate.endswith('"'):
+            try:
+                versions.append(int(candidate[len(prefix):-1]))
+            except ValueError:
+                pass
+    return versions
+
+
+def conditional_headers(etag: str) -> dict:
+    """
+    Headers for every response that carries an ETag.
+
+    ``no-cache`` makes browsers revalidate every time, ``private`` keeps
+    shared caches from storing per-user data, and ``Vary: Authorization``
+    keeps a cached response from being reused for another user's token.
+    """
+    return {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response for a matching If-None-Match."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=conditional_headers(etag))
@@ -1,6 +1,14 @@
 import os
 from dotenv import load_dotenv
-from sqlmodel import create_engine, Session
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlmodel import create_engine, Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .db_config import DatabaseConfig, configure_engine
+from .search import SEARCH_VECTOR_SQL
+from .data_version import DATA_VERSION_SQL
 
 # Load environment variables from the parent directory's .env file
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
@@ -16,8 +24,138 @@ if not DATABASE_URL:
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-engine = create_engine(DATABASE_URL, echo=True)
+
+def to_async_url(url: str):
+    """
+    Convert a libpq-style URL into an asyncpg URL plus connect arguments.
+
+    asyncpg does not understand libpq's ``sslmode``/``channel_binding`` query
+    parameters (Neon URLs carry both), so sslmode is passed as ``ssl``.
+    """
+    parsed = make_url(url).set(drivername="postgresql+asyncpg")
+    query = dict(parsed.query)
+    query.pop("channel_binding", None)
+    sslmode = query.pop("sslmode", None)
+    connect_args = {}
+    if sslmode and sslmode != "disable":
+        connect_args["ssl"] = sslmode
+    return parsed.set(query=query), connect_args
+
+
+DATABASE_CONFIG = DatabaseConfig.from_env()
+
+# Sync engine: MCP tools, processors and scripts
+engine = create_engine(DATABASE_URL, **DATABASE_CONFIG.engine_kwargs())
+configure_engine(engine, DATABASE_CONFIG)
+
+# Async engine: API route handlers, so queries don't block the event loop
+ASYNC_DATABASE_URL, _async_connect_args = to_async_url(DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **DATABASE_CONFIG.async_engine_kwargs(_async_connect_args)
+)
+configure_engine(async_engine, DATABASE_CONFIG)
+
+
+# LISTEN needs a session-level connection, which PgBouncer in transaction
+# mode cannot give: DATABASE_DIRECT_URL points such connections at
+# Postgres itself (DATABASE_URL is used when it is not set)
+DATABASE_DIRECT_URL = os.getenv("DATABASE_DIRECT_URL")
+
+
+def asyncpg_connect_params():
+    """DSN and keyword arguments for a plain asyncpg connection outside the pool."""
+    if DATABASE_DIRECT_URL:
+        url, connect_args = to_async_url(DATABASE_DIRECT_URL.replace("postgres://", "postgresql://", 1))
+    else:
+        if DATABASE_CONFIG.pgbouncer:
+            print("DB_PGBOUNCER is on but DATABASE_DIRECT_URL is not set; LISTEN through PgBouncer will miss notifications")
+        url, connect_args = ASYNC_DATABASE_URL, _async_connect_args
+    dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+    kwargs = {"ssl": connect_args["ssl"]} if "ssl" in connect_args else {}
+    return dsn, kwargs
+
+
+# expire_on_commit=False: attributes of committed objects stay readable
+# without an implicit (and, under asyncio, illegal) lazy reload
+async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session():
+    async with async_session_factory() as session:
+        yield session
+
+
+# Idempotent statements run on startup for changes that create_all() cannot
+# apply to tables that already exist
+SCHEMA_UPGRADES = [
+    # Tags are stored lowercased so tag filters can be answered by the GIN index.
+    # Only rows that are not normalized yet (upper-case, untrimmed, empty or
+    # duplicate tags) are rewritten, so later startups change nothing
+    """
+    UPDATE tasks SET tags = ARRAY(
+        SELECT lower(btrim(tag)) FROM unnest(tags) WITH ORDINALITY AS t(tag, n)
+        WHERE btrim(tag) <> ''
+        GROUP BY lower(btrim(tag)) ORDER BY min(n)
+    )
+    WHERE tags IS NOT NULL AND (
+        EXISTS (SELECT 1 FROM unnest(tags) AS t(tag) WHERE tag <> lower(btrim(tag)) OR btrim(tag) = '')
+        OR cardinality(tags) > (SELECT count(DISTINCT tag) FROM unnest(tags) AS t(tag))
+    )
+    """,
+    # Full-text search vector, kept current by PostgreSQL itself
+    f"""
+    ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING gin (search_vector)",
+    # Per-user data versions behind the list ETags
+    *DATA_VERSION_SQL,
+    # Row version for optimistic concurrency, bumped whoever updates the row
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1",
+    """
+    CREATE OR REPLACE FUNCTION bump_task_version() RETURNS trigger AS $$
+    BEGIN
+        NEW.version := OLD.version + 1;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER tasks_bump_version
+    BEFORE UPDATE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION bump_task_version()
+    """,
+    # Fuzzy title matching for find_task. pg_trgm is optional: without it
+    # (or the privilege to install it) find_task uses full-text matching only
+    """
+    DO $$
+    BEGIN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS ix_tasks_title_trgm ON tasks USING gin (title gin_trgm_ops);
+    EXCEPTION WHEN OTHERS THEN
+        RAISE NOTICE 'pg_trgm unavailable: %', SQLERRM;
+    END
+    $$
+    """,
+    # Rolling conversation summaries (src/agent/memory.py)
+    "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS summary text",
+    "ALTER TABLE conversations ADD COLUMN IF NOT EXISTS summary_message_id integer",
+]
+
+
+def init_db():
+    """Create missing tables and indexes."""
+    SQLModel.metadata.create_all(engine)
+    # create_all() skips tables that already exist, so indexes added to an
+    # existing model have to be created explicitly
+    with engine.begin() as connection:
+        for statement in SCHEMA_UPGRADES:
+            connection.execute(text(statement))
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
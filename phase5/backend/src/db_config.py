@@ -0,0 +1,152 @@
+"""Database engine configuration and connection pool statistics."""
+
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from .metrics import LatencyStats
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class DatabaseConfig:
+    """
+    Engine and pool settings, read from ``DB_*`` environment variables.
+
+    DB_POOL_SIZE / DB_MAX_OVERFLOW     persistent and burst connections per engine
+    DB_POOL_TIMEOUT                    seconds to wait for a free connection
+    DB_POOL_RECYCLE                    seconds before a connection is replaced
+    DB_POOL_PRE_PING                   test connections on checkout
+    DB_STATEMENT_TIMEOUT_MS            per-statement timeout, 0 disables it
+    DB_PGBOUNCER                       safe for PgBouncer transaction pooling
+                                       (LISTEN then needs DATABASE_DIRECT_URL)
+    DB_ECHO                            log every SQL statement
+    """
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_timeout_ms: int = 0
+    pgbouncer: bool = False
+    echo: bool = False
+
+    @classmethod
+    def from_env(cls) -> "DatabaseConfig":
+        return cls(
+            pool_size=_env_int("DB_POOL_SIZE", cls.pool_size),
+            max_overflow=_env_int("DB_MAX_OVERFLOW", cls.max_overflow),
+            pool_timeout=_env_int("DB_POOL_TIMEOUT", cls.pool_timeout),
+            pool_recycle=_env_int("DB_POOL_RECYCLE", cls.pool_recycle),
+            pool_pre_ping=_env_bool("DB_POOL_PRE_PING", cls.pool_pre_ping),
+            statement_timeout_ms=_env_int("DB_STATEMENT_TIMEOUT_MS", cls.statement_timeout_ms),
+            pgbouncer=_env_bool("DB_PGBOUNCER", cls.pgbouncer),
+            echo=_env_bool("DB_ECHO", cls.echo),
+        )
+
+    def _pool_kwargs(self) -> Dict[str, Any]:
+        return {
+            "echo": self.echo,
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+        }
+
+    def engine_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for ``create_engine`` (psycopg2)."""
+        kwargs = self._pool_kwargs()
+        kwargs["poolclass"] = TimedQueuePool
+        # PgBouncer rejects startup options; the timeout is set per
+        # transaction instead (see configure_engine)
+        if self.statement_timeout_ms and not self.pgbouncer:
+            kwargs["connect_args"] = {"options": f"-c statement_timeout={self.statement_timeout_ms}"}
+        return kwargs
+
+    def async_engine_kwargs(self, connect_args: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Keyword arguments for ``create_async_engine`` (asyncpg)."""
+        kwargs = self._pool_kwargs()
+        kwargs["poolclass"] = TimedAsyncQueuePool
+        connect_args = dict(connect_args or {})
+        if self.pgbouncer:
+            # Prepared statements are per server connection, which transaction
+            # pooling hands out to a different client on every transaction
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+        elif self.statement_timeout_ms:
+            connect_args["server_settings"] = {"statement_timeout": str(self.statement_timeout_ms)}
+        kwargs["connect_args"] = connect_args
+        return kwargs
+
+
+def configure_engine(engine, config: DatabaseConfig) -> None:
+    """Attach per-transaction settings that cannot be set at connect time."""
+    if not (config.pgbouncer and config.statement_timeout_ms):
+        return
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "begin")
+    def _set_statement_timeout(connection):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(config.statement_timeout_ms)}")
+
+
+class _TimedPoolMixin:
+    """Records how long each checkout waited for (or opened) a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_timer = LatencyStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.checkout_timer.record(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(engine) -> Dict[str, Any]:
+    """Live statistics for an engine's connection pool."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    status: Dict[str, Any] = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # SQLAlchemy reports unused overflow capacity as a negative number
+        "overflow": max(pool.overflow(), 0),
+    }
+    timer = getattr(pool, "checkout_timer", None)
+    if timer is not None:
+        wait = timer.snapshot()
+        status.update({
+            "checkouts": wait["count"],
+            "checkout_wait_avg_ms": wait["avg_ms"],
+            "checkout_wait_max_ms": wait["max_ms"],
+        })
+    return status
@@ -1,17 +1,42 @@
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import asyncio
+import os
+import secrets
+from contextlib import asynccontextmanager, suppress
+from typing import Optional
+from fastapi import Depends, FastAPI, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import SQLModel
 
-from .database import engine
+from .agent.fast_path import fast_path_stats
+from .database import init_db, engine, async_engine, asyncpg_connect_params
+from .db_config import pool_status
+from .passwords import password_hasher
 from .routes import auth, tasks, chat
+from .services import event_publisher, outbox_relay, task_cache
+from .token_cache import token_cache
+
+# The /health/* statistics expose pool, cache and relay internals, so they
+# need "Authorization: Bearer <HEALTH_API_TOKEN>"; unset, they are disabled.
+# /health itself stays public for liveness probes.
+HEALTH_API_TOKEN = os.getenv("HEALTH_API_TOKEN")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Create database tables on startup."""
-    SQLModel.metadata.create_all(engine)
+    """Create database tables on startup and release connections on shutdown."""
+    init_db()
+    await event_publisher.start()
+    dsn, connect_kwargs = asyncpg_connect_params()
+    revocations = asyncio.create_task(token_cache.listen(dsn, **connect_kwargs))
+    relay = asyncio.create_task(outbox_relay.run())
     yield
+    await outbox_relay.stop(relay)
+    revocations.cancel()
+    with suppress(asyncio.CancelledError):
+        await revocations
+    await async_engine.dispose()
+    await task_cache.store.aclose()
+    await event_publisher.aclose()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -34,6 +59,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Include routers
@@ -48,6 +74,52 @@ def health_check():
     return {"status": "ok", "message": "Backend is running"}
 
 
+def require_health_token(authorization: Optional[str] = Header(None)) -> None:
+    """Reject callers without the health statistics token."""
+    if not HEALTH_API_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Health statistics are disabled: HEALTH_API_TOKEN is not set"
+        )
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), HEALTH_API_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing health token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+@app.get("/health/db", dependencies=[Depends(require_health_token)])
+def database_health():
+    """Connection pool statistics, for sizing pools per pod."""
+    return {
+        "sync_pool": pool_status(engine),
+        "async_pool": pool_status(async_engine)
+    }
+
+
+@app.get("/health/auth", dependencies=[Depends(require_health_token)])
+def auth_health():
+    """Password hashing pool and verified-token cache statistics."""
+    return {
+        **password_hasher.stats(),
+        "token_cache": token_cache.stats()
+    }
+
+
+@app.get("/health/events", dependencies=[Depends(require_health_token)])
+def events_health():
+    """Outbox relay progress, commit-to-publish lag, and events per request to the sidecar."""
+    return {"outbox": outbox_relay.stats(), "publisher": event_publisher.stats()}
+
+
+@app.get("/health/agent", dependencies=[Depends(require_health_token)])
+def agent_health():
+    """Chat fast path hit rate, and turn latency with and without the LLM."""
+    return {"fast_path": fast_path_stats.stats()}
+
+
 @app.get("/")
 def root():
     """Root endpoint."""
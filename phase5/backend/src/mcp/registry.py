@@ -0,0 +1,155 @@
+"""Tool registry: tools register with a decorator and get schemas from their signatures."""
+
+import inspect
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple, Union, get_args, get_origin, get_type_hints
+
+from pydantic import TypeAdapter
+
+# Arguments filled in by the server (never by the model), so they are left
+# out of the schemas the model sees
+INJECTED_ARGUMENTS = ("user_id",)
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """A registered tool, with its schemas computed once at registration."""
+    name: str
+    func: Callable[..., Dict[str, Any]]
+    description: str
+    parameters: Dict[str, Any]
+    # Reads only, so it may run alongside other reads of the same turn
+    read_only: bool = False
+
+    def definition(self) -> Dict[str, Any]:
+        """Tool definition in OpenAI function calling format."""
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.parameters
+            }
+        }
+
+
+_tools: Dict[str, ToolSpec] = {}
+_definitions: Optional[Tuple[Dict[str, Any], ...]] = None
+
+
+def _parse_docstring(func: Callable) -> Tuple[str, Dict[str, str]]:
+    """Summary paragraph and per-argument descriptions from a Google-style docstring."""
+    doc = inspect.getdoc(func) or ""
+    summary = " ".join(doc.split("\n\n")[0].split())
+    arguments: Dict[str, str] = {}
+    current = None
+    in_args = False
+    for line in doc.splitlines():
+        if line.strip() == "Args:":
+            in_args = True
+            continue
+        if not in_args:
+            continue
+        if line and not line.startswith(" "):
+            break  # Next section, e.g. "Returns:"
+        match = re.match(r"^ {4}(\w+): ?(.*)$", line)
+        if match:
+            current = match.group(1)
+            arguments[current] = match.group(2).strip()
+        elif current and line.strip():
+            arguments[current] += " " + line.strip()
+    return summary, arguments
+
+
+def _parameter_schema(annotation: Any) -> Dict[str, Any]:
+    # Optional[X] means "may be omitted", which the schema already says by
+    # leaving the argument out of "required"; null is not a useful value
+    if get_origin(annotation) is Union:
+        members = [member for member in get_args(annotation) if member is not type(None)]
+        if len(members) == 1:
+            annotation = members[0]
+    return TypeAdapter(annotation).json_schema()
+
+
+def build_parameters(func: Callable) -> Dict[str, Any]:
+    """JSON schema of a tool's arguments, from its signature and docstring."""
+    _, descriptions = _parse_docstring(func)
+    hints = get_type_hints(func)
+    properties: Dict[str, Any] = {}
+    required = []
+    for name, parameter in inspect.signature(func).parameters.items():
+        if name in INJECTED_ARGUMENTS:
+            continue
+        schema = _parameter_schema(hints.get(name, Any))
+        if name in descriptions:
+            schema["description"] = descriptions[name]
+        properties[name] = schema
+        if parameter.default is inspect.Parameter.empty:
+            required.append(name)
+    parameters: Dict[str, Any] = {"type": "object", "properties": properties}
+    if required:
+        parameters["required"] = required
+    return parameters
+
+
+def tool(
+    name: Optional[str] = None,
+    description: Optional[str] = None,
+    read_only: bool = False
+) -> Callable[[Callable], Callable]:
+    """
+    Register the decorated function as a tool, at import time.
+
+    The name defaults to the function name and the description to the
+    docstring summary. Argument types come from the signature (use
+    ``Literal`` for enumerations) and argument descriptions from the
+    docstring's ``Args:`` section. ``read_only`` marks tools that never
+    write, which the agent may run concurrently with each other.
+    """
+    def decorator(func: Callable) -> Callable:
+        tool_name = name or func.__name__
+        if _definitions is not None:
+            raise RuntimeError(f"Cannot register tool '{tool_name}': the registry is frozen")
+        if tool_name in _tools:
+            raise ValueError(f"Tool '{tool_name}' is already registered")
+        summary, _ = _parse_docstring(func)
+        _tools[tool_name] = ToolSpec(
+            name=tool_name,
+            func=func,
+            description=description or summary,
+            parameters=build_parameters(func),
+            read_only=read_only
+        )
+        return func
+    return decorator
+
+
+def get_tool(name: str) -> Callable:
+    """Get a registered tool function."""
+    if name not in _tools:
+        raise ValueError(f"Tool '{name}' not found")
+    return _tools[name].func
+
+
+def is_read_only(name: str) -> bool:
+    """Whether a tool only reads; unknown tools count as writes."""
+    return name in _tools and _tools[name].read_only
+
+
+def get_tool_specs() -> Dict[str, ToolSpec]:
+    """All registered tools, by name."""
+    return dict(_tools)
+
+
+def get_tool_definitions() -> Tuple[Dict[str, Any], ...]:
+    """
+    Tool definitions in OpenAI function calling format.
+
+    Built on the first call, which freezes the registry; later calls return
+    the same tuple, which callers must not modify.
+    """
+    global _definitions
+    if _definitions is None:
+        _definitions = tuple(spec.definition() for spec in _tools.values())
+    return _definitions
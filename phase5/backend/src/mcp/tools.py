@@ -1,31 +1,59 @@
 """MCP tool implementations for task management."""
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal, Sequence
+from sqlalchemy import false, func, literal, or_
 from sqlmodel import Session, select
 from datetime import datetime, timezone
 
 from ..database import engine
 from ..models import Task, Priority
+from ..tags import normalize_tags, parse_tag_filter, tag_filter_clause
+from ..search import (
+    build_tsquery,
+    search_clause,
+    rank_expression,
+    has_trigram_support,
+    title_similarity,
+    title_similarity_clause,
+)
+from ..services.task_cache import task_cache
+from ..services.task_batch import update_tasks_statement, delete_tasks_statement
+from .registry import tool
 
+PriorityName = Literal["high", "medium", "low"]
 
+TaskField = Literal[
+    "id", "title", "description", "completed", "priority", "tags",
+    "due_date", "created_at", "updated_at", "version"
+]
+TASK_FIELDS = TaskField.__args__
+# Enough to answer most questions without descriptions and timestamps;
+# version is what update_task takes as expected_version
+LIST_DEFAULT_FIELDS = ("title", "completed", "priority", "tags", "due_date", "version")
+LIST_DEFAULT_LIMIT = 50
+LIST_MAX_LIMIT = 200
+FIND_MAX_LIMIT = 20
+
+
+@tool()
 def add_task(
     user_id: str, 
     title: str, 
     description: Optional[str] = None,
-    priority: Optional[str] = "medium",
+    priority: Optional[PriorityName] = "medium",
     tags: Optional[List[str]] = None,
     due_date: Optional[str] = None
 ) -> Dict[str, Any]:
     """
-    Create a new task for the user.
+    Create a new task for the user with optional priority, tags, and due date.
     
     Args:
         user_id: User identifier from JWT token
-        title: Task title (required, max 200 chars)
-        description: Task description (optional, max 1000 chars)
-        priority: Task priority ("high", "medium", "low"), defaults to "medium"
-        tags: List of tag strings (optional)
-        due_date: Due date in ISO format (optional)
+        title: Task title (max 200 characters)
+        description: Task description (optional, max 1000 characters)
+        priority: Task priority (default: medium)
+        tags: List of tags for the task (e.g., ['work', 'urgent'])
+        due_date: Due date in ISO format (e.g., 2026-02-15T10:00:00)
     
     Returns:
         Dictionary with success status, task_id, title, and message
@@ -76,13 +104,14 @@ def add_task(
                 title=title.strip(),
                 description=description.strip() if description else None,
                 priority=Priority(priority.lower()) if priority else Priority.medium,
-                tags=tags,
+                tags=normalize_tags(tags),
                 due_date=parsed_due_date
             )
             
             session.add(new_task)
             session.commit()
             session.refresh(new_task)
+            task_cache.invalidate(user_id)
             
             return {
                 "success": True,
@@ -100,83 +129,63 @@ def add_task(
         }
 
 
+@tool(read_only=True)
 def list_tasks(
     user_id: str, 
-    status: str = "all",
-    priority: Optional[str] = None,
+    status: Literal["all", "pending", "completed"] = "all",
+    priority: Optional[PriorityName] = None,
     tag: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    tag_mode: Literal["any", "all"] = "any",
+    limit: int = LIST_DEFAULT_LIMIT,
+    offset: int = 0,
+    fields: Optional[List[TaskField]] = None
 ) -> Dict[str, Any]:
     """
-    Retrieve user's tasks with optional filtering.
+    Retrieve user's tasks with optional filtering by status, priority, tag, or search keyword.
     
     Args:
         user_id: User identifier from JWT token
-        status: Filter by status ("all", "pending", "completed")
-        priority: Filter by priority ("high", "medium", "low")
-        tag: Filter by tag (tasks containing this tag)
-        search: Search keyword in title or description
+        status: Filter tasks by status (default: all)
+        priority: Filter tasks by priority
+        tag: Filter tasks containing this tag
+        search: Search words in title or description; partial words match, best matches first
+        tags: Filter by several tags at once
+        tag_mode: Match tasks with any of the tags or with all of them (default: any)
+        limit: Maximum number of tasks to return (default: 50, max: 200)
+        offset: Number of tasks to skip, for the next page (default: 0)
+        fields: Task fields to include (default: id, title, completed, priority, tags, due_date, version)
     
     Returns:
-        Dictionary with success status, count, and list of tasks
+        Dictionary with success status, count (tasks returned), total
+        (tasks matching), and the tasks as "columns" plus one value
+        list per task in "rows"
     """
+    # Normalize the filters so equivalent calls share a cache entry
+    if priority:
+        priority = priority.lower()
+    tag_values = parse_tag_filter(([tag] if tag else []) + (tags or []))
+    search = search.lower() if search else None
+    limit = max(1, min(limit, LIST_MAX_LIMIT))
+    offset = max(0, offset)
+    columns = ["id"] + [field for field in TASK_FIELDS if field != "id" and field in (fields or LIST_DEFAULT_FIELDS)]
+    params = {
+        "status": status if status in ("completed", "pending") else "all",
+        "priority": priority,
+        "tags": sorted(tag_values),
+        "tag_mode": tag_mode if tag_values else None,
+        "search": search,
+        "limit": limit,
+        "offset": offset,
+        "fields": columns,
+    }
+    
     try:
-        with Session(engine) as session:
-            # Build query filtered by user_id
-            query = select(Task).where(Task.user_id == user_id)
-            
-            # Apply status filter
-            if status == "completed":
-                query = query.where(Task.completed == True)
-            elif status == "pending":
-                query = query.where(Task.completed == False)
-            # "all" - no additional filter
-            
-            # Apply priority filter
-            if priority:
-                try:
-                    priority_enum = Priority(priority.lower())
-                    query = query.where(Task.priority == priority_enum)
-                except ValueError:
-                    pass  # Ignore invalid priority
-            
-            # Apply search filter (case-insensitive)
-            if search:
-                search_pattern = f"%{search}%"
-                query = query.where(
-                    (Task.title.ilike(search_pattern)) | 
-                    (Task.description.ilike(search_pattern))
-                )
-            
-            # Order by created_at desc
-            query = query.order_by(Task.created_at.desc())
-            
-            tasks = session.exec(query).all()
-            
-            # Apply tag filter (post-query since ARRAY contains is complex)
-            if tag:
-                tasks = [t for t in tasks if t.tags and tag.lower() in [tg.lower() for tg in t.tags]]
-            
-            # Format tasks with new fields
-            task_list = [
-                {
-                    "id": task.id,
-                    "title": task.title,
-                    "description": task.description,
-                    "completed": task.completed,
-                    "priority": task.priority.value if task.priority else "medium",
-                    "tags": task.tags or [],
-                    "due_date": task.due_date.isoformat() if task.due_date else None,
-                    "created_at": task.created_at.isoformat()
-                }
-                for task in tasks
-            ]
-            
-            return {
-                "success": True,
-                "count": len(task_list),
-                "tasks": task_list
-            }
+        return task_cache.get_or_load(
+            user_id, "mcp", params,
+            lambda: _query_tasks(user_id, status, priority, tag_values, tag_mode, search, limit, offset, columns)
+        )
     except Exception as e:
         return {
             "success": False,
@@ -184,37 +193,184 @@ def list_tasks(
         }
 
 
+def _encode_field(value: Any) -> Any:
+    if isinstance(value, Priority):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _query_tasks(
+    user_id: str,
+    status: str,
+    priority: Optional[str],
+    tag_values: List[str],
+    tag_mode: str,
+    search: Optional[str],
+    limit: int = LIST_DEFAULT_LIMIT,
+    offset: int = 0,
+    columns: Sequence[str] = ("id",) + LIST_DEFAULT_FIELDS
+) -> Dict[str, Any]:
+    """Run the list_tasks query; errors propagate to the caller."""
+    with Session(engine) as session:
+        # Only the requested columns, plus the number of matches before paging
+        query = select(
+            *(getattr(Task, column) for column in columns),
+            func.count().over().label("total")
+        ).where(Task.user_id == user_id)
+        
+        # Apply status filter
+        if status == "completed":
+            query = query.where(Task.completed == True)
+        elif status == "pending":
+            query = query.where(Task.completed == False)
+        # "all" - no additional filter
+        
+        # Apply priority filter
+        if priority:
+            try:
+                priority_enum = Priority(priority)
+                query = query.where(Task.priority == priority_enum)
+            except ValueError:
+                pass  # Ignore invalid priority
+        
+        # Apply tag filter (case-insensitive, GIN-indexed)
+        if tag_values:
+            query = query.where(tag_filter_clause(tag_values, tag_mode))
+        
+        empty = {"success": True, "count": 0, "total": 0, "offset": offset, "columns": list(columns), "rows": []}
+        
+        # Apply full-text search (prefix matching, best matches first)
+        tsquery = build_tsquery(search) if search else None
+        if search and tsquery is None:
+            return empty
+        if tsquery is not None:
+            query = query.where(search_clause(tsquery)).order_by(
+                rank_expression(tsquery).desc(), Task.created_at.desc(), Task.id.desc()
+            )
+        else:
+            # Order by created_at desc
+            query = query.order_by(Task.created_at.desc(), Task.id.desc())
+        
+        results = session.exec(query.limit(limit).offset(offset)).all()
+        if not results:
+            return empty
+        
+        # Compact encoding: field names once, then one value list per task
+        rows = [[_encode_field(value) for value in result[:-1]] for result in results]
+        
+        return {
+            "success": True,
+            "count": len(rows),
+            "total": results[0].total,
+            "offset": offset,
+            "columns": list(columns),
+            "rows": rows
+        }
+
+
+@tool(read_only=True)
+def find_task(
+    user_id: str,
+    query: str,
+    status: Literal["all", "pending", "completed"] = "all",
+    limit: int = 5
+) -> Dict[str, Any]:
+    """
+    Find the tasks whose title best matches a description, to get their IDs.
+    
+    Args:
+        user_id: User identifier from JWT token
+        query: Words from the task title or description, e.g. "laundry" or "buy milk"
+        status: Only consider tasks with this status (default: all)
+        limit: Maximum number of matches (default: 5, max: 20)
+    
+    Returns:
+        Dictionary with success status and the best matches first, each
+        with id, title, completed and a relevance score
+    """
+    query = " ".join(query.lower().split())
+    if not query:
+        return {
+            "success": False,
+            "error": "Query cannot be empty"
+        }
+    limit = max(1, min(limit, FIND_MAX_LIMIT))
+    status = status if status in ("completed", "pending") else "all"
+    params = {"query": query, "status": status, "limit": limit}
+    
+    try:
+        return task_cache.get_or_load(
+            user_id, "mcp-find", params,
+            lambda: _find_tasks(user_id, query, status, limit)
+        )
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to find tasks: {str(e)}"
+        }
+
+
+def _find_tasks(user_id: str, query: str, status: str, limit: int) -> Dict[str, Any]:
+    """Run the find_task query; errors propagate to the caller."""
+    with Session(engine) as session:
+        tsquery = build_tsquery(query, match_all=False)
+        score = rank_expression(tsquery) if tsquery is not None else literal(0.0)
+        matches = search_clause(tsquery) if tsquery is not None else false()
+        if has_trigram_support(session):
+            # Typos and partial words: trigram similarity to the title
+            score = score + title_similarity(query)
+            matches = or_(matches, title_similarity_clause(query))
+        
+        statement = (
+            select(Task.id, Task.title, Task.completed, score.label("score"))
+            .where(Task.user_id == user_id, matches)
+            .order_by(score.desc(), Task.completed, Task.updated_at.desc())
+            .limit(limit)
+        )
+        if status == "completed":
+            statement = statement.where(Task.completed == True)
+        elif status == "pending":
+            statement = statement.where(Task.completed == False)
+        
+        found = [
+            {"id": row.id, "title": row.title, "completed": row.completed, "score": round(row.score, 3)}
+            for row in session.exec(statement).all()
+        ]
+        return {"success": True, "count": len(found), "matches": found}
+
+
+@tool()
 def complete_task(user_id: str, task_id: int) -> Dict[str, Any]:
     """
     Mark a task as completed.
     
     Args:
         user_id: User identifier from JWT token
-        task_id: ID of task to complete
+        task_id: ID of the task to complete
     
     Returns:
         Dictionary with success status, task_id, completed status, and message
     """
     try:
-        with Session(engine) as session:
-            # Find task by id AND user_id (security)
-            task = session.exec(
-                select(Task).where(Task.id == task_id, Task.user_id == user_id)
-            ).first()
+        # Returned rows stay readable after commit without a reload
+        with Session(engine, expire_on_commit=False) as session:
+            # Mark as completed (idempotent); the WHERE on user_id keeps it
+            # to the user's own tasks
+            row = session.exec(update_tasks_statement(
+                user_id, [task_id], {"completed": True, "updated_at": datetime.now(timezone.utc)}
+            )).first()
             
-            if not task:
+            if not row:
                 return {
                     "success": False,
                     "error": f"Task {task_id} not found"
                 }
             
-            # Mark as completed (idempotent)
-            task.completed = True
-            task.updated_at = datetime.now(timezone.utc)
-            
-            session.add(task)
+            task = row[0]
             session.commit()
-            session.refresh(task)
+            task_cache.invalidate(user_id)
             
             return {
                 "success": True,
@@ -230,35 +386,34 @@ def complete_task(user_id: str, task_id: int) -> Dict[str, Any]:
         }
 
 
+@tool()
 def delete_task(user_id: str, task_id: int) -> Dict[str, Any]:
     """
     Delete a task permanently.
     
     Args:
         user_id: User identifier from JWT token
-        task_id: ID of task to delete
+        task_id: ID of the task to delete
     
     Returns:
         Dictionary with success status, task_id, and message
     """
     try:
         with Session(engine) as session:
-            # Find task by id AND user_id (security)
-            task = session.exec(
-                select(Task).where(Task.id == task_id, Task.user_id == user_id)
+            # Delete task by id AND user_id (security)
+            row = session.exec(
+                delete_tasks_statement(user_id, [task_id]).returning(Task.title)
             ).first()
             
-            if not task:
+            if not row:
                 return {
                     "success": False,
                     "error": f"Task {task_id} not found"
                 }
             
-            task_title = task.title
-            
-            # Delete task
-            session.delete(task)
+            task_title = row[1]
             session.commit()
+            task_cache.invalidate(user_id)
             
             return {
                 "success": True,
@@ -272,28 +427,33 @@ def delete_task(user_id: str, task_id: int) -> Dict[str, Any]:
         }
 
 
+@tool()
 def update_task(
     user_id: str, 
     task_id: int, 
     title: Optional[str] = None, 
     description: Optional[str] = None,
-    priority: Optional[str] = None,
+    priority: Optional[PriorityName] = None,
     tags: Optional[List[str]] = None,
     due_date: Optional[str] = None,
-    completed: Optional[bool] = None
+    completed: Optional[bool] = None,
+    expected_version: Optional[int] = None
 ) -> Dict[str, Any]:
     """
-    Update task fields.
+    Update task fields including title, description, priority, tags, due date, or completion status.
     
     Args:
         user_id: User identifier from JWT token
-        task_id: ID of task to update
+        task_id: ID of the task to update
         title: New task title (optional)
         description: New task description (optional)
-        priority: New priority - "high", "medium", or "low" (optional)
+        priority: New priority (optional)
         tags: New list of tags (optional)
-        due_date: New due date in ISO format (optional)
+        due_date: New due date in ISO format, or empty string to clear (optional)
         completed: New completion status (optional)
+        expected_version: Task version from list_tasks; the update is rejected
+            if the task changed since (optional). On a conflict nothing is
+            updated and the result carries "conflict": True and the current version
     
     Returns:
         Dictionary with success status, updated task info, and message
@@ -348,37 +508,49 @@ def update_task(
                 }
     
     try:
-        with Session(engine) as session:
-            # Find task by id AND user_id (security)
-            task = session.exec(
-                select(Task).where(Task.id == task_id, Task.user_id == user_id)
-            ).first()
-            
-            if not task:
-                return {
-                    "success": False,
-                    "error": f"Task {task_id} not found"
-                }
-            
+        # Returned rows stay readable after commit without a reload
+        with Session(engine, expire_on_commit=False) as session:
             # Update fields
+            values: Dict[str, Any] = {"updated_at": datetime.now(timezone.utc)}
             if title is not None:
-                task.title = title.strip()
+                values["title"] = title.strip()
             if description is not None:
-                task.description = description.strip() if description.strip() else None
+                values["description"] = description.strip() if description.strip() else None
             if priority is not None:
-                task.priority = Priority(priority.lower())
+                values["priority"] = Priority(priority.lower())
             if tags is not None:
-                task.tags = tags if tags else None
+                values["tags"] = normalize_tags(tags)
             if parsed_due_date is not None:
-                task.due_date = None if parsed_due_date == "clear" else parsed_due_date
+                values["due_date"] = None if parsed_due_date == "clear" else parsed_due_date
             if completed is not None:
-                task.completed = completed
+                values["completed"] = completed
             
-            task.updated_at = datetime.now(timezone.utc)
+            # Update task by id AND user_id (security), compare-and-swap on
+            # the version when one is expected
+            row = session.exec(update_tasks_statement(
+                user_id, [task_id], values,
+                expected_versions=[expected_version] if expected_version is not None else None
+            )).first()
+            
+            if not row:
+                current_version = session.exec(
+                    select(Task.version).where(Task.id == task_id, Task.user_id == user_id)
+                ).first()
+                if current_version is None:
+                    return {
+                        "success": False,
+                        "error": f"Task {task_id} not found"
+                    }
+                return {
+                    "success": False,
+                    "conflict": True,
+                    "current_version": current_version,
+                    "error": f"Task {task_id} was changed by someone else; fetch it again and retry"
+                }
             
-            session.add(task)
+            task = row[0]
             session.commit()
-            session.refresh(task)
+            task_cache.invalidate(user_id)
             
             return {
                 "success": True,
@@ -389,6 +561,7 @@ def update_task(
                 "tags": task.tags or [],
                 "due_date": task.due_date.isoformat() if task.due_date else None,
                 "completed": task.completed,
+                "version": task.version,
                 "message": f"Task '{task.title}' updated successfully"
             }
     except Exception as e:
@@ -0,0 +1,30 @@
+"""In-process latency counters reported by the health endpoints."""
+
+import threading
+from typing import Dict
+
+
+class LatencyStats:
+    """Thread-safe running count, average and maximum of durations."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def snapshot(self, prefix: str = "") -> Dict[str, float]:
+        """``count``, ``avg_ms`` and ``max_ms``, with keys prefixed by ``prefix``."""
+        with self._lock:
+            count, total, maximum = self.count, self.total, self.max
+        return {
+            f"{prefix}count": count,
+            f"{prefix}avg_ms": round(total / count * 1000, 3) if count else 0.0,
+            f"{prefix}max_ms": round(maximum * 1000, 3),
+        }
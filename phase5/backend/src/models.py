@@ -1,11 +1,29 @@
 from datetime import datetime, timezone
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from sqlmodel import Field, SQLModel, Relationship, Column
-from sqlalchemy import Enum as SAEnum, ARRAY, String
+from sqlalchemy import Enum as SAEnum, ARRAY, String, Index, DateTime, TypeDecorator, BigInteger
+from sqlalchemy.dialects.postgresql import JSONB
 from enum import Enum
 import uuid
 
 
+class UTCDateTime(TypeDecorator):
+    """
+    TIMESTAMP WITHOUT TIME ZONE that accepts timezone-aware datetimes.
+
+    Aware values are converted to naive UTC before binding. psycopg2 let the
+    server do this implicitly, but asyncpg rejects aware datetimes for
+    timestamp columns.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
 class Priority(str, Enum):
     """Task priority levels."""
     high = "high"
@@ -27,13 +45,24 @@ class User(SQLModel, table=True):
     email: Optional[str] = Field(default=None, unique=True, index=True)
     username: Optional[str] = Field(default=None)
     password_hash: Optional[str] = Field(default=None)
-    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc), sa_type=UTCDateTime)
     
     tasks: List["Task"] = Relationship(back_populates="user")
 
 
 class Task(SQLModel, table=True):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Composite indexes for keyset pagination, one per sortable column
+        Index("ix_tasks_user_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_tasks_user_updated_at_id", "user_id", "updated_at", "id"),
+        Index("ix_tasks_user_due_date_id", "user_id", "due_date", "id"),
+        Index("ix_tasks_user_title_id", "user_id", "title", "id"),
+        Index("ix_tasks_user_priority_id", "user_id", "priority", "id"),
+        Index("ix_tasks_user_id_id", "user_id", "id"),
+        # Tag filters (@> / &&) on the lowercased tags array
+        Index("ix_tasks_tags_gin", "tags", postgresql_using="gin"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(foreign_key="users.id", index=True)
@@ -50,7 +79,7 @@ class Task(SQLModel, table=True):
         default=None,
         sa_column=Column(ARRAY(String), nullable=True)
     )
-    due_date: Optional[datetime] = Field(default=None)
+    due_date: Optional[datetime] = Field(default=None, sa_type=UTCDateTime)
     
     # Phase 5: Advanced features - Recurring tasks
     is_recurring: bool = Field(default=False)
@@ -58,11 +87,15 @@ class Task(SQLModel, table=True):
         default=None,
         sa_column=Column(SAEnum(RecurrencePattern), nullable=True)
     )
-    recurrence_end_date: Optional[datetime] = Field(default=None)
+    recurrence_end_date: Optional[datetime] = Field(default=None, sa_type=UTCDateTime)
     parent_task_id: Optional[int] = Field(default=None, foreign_key="tasks.id")
     
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Incremented by a database trigger on every UPDATE (see SCHEMA_UPGRADES);
+    # conditional writes compare it to detect concurrent modifications
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+    
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), sa_type=UTCDateTime)
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), sa_type=UTCDateTime)
     
     user: Optional[User] = Relationship(back_populates="tasks")
 
@@ -75,8 +108,12 @@ class Conversation(SQLModel, table=True):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     user_id: str = Field(index=True)
     title: Optional[str] = Field(default=None, max_length=200)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Rolling summary of the messages up to and including summary_message_id,
+    # sent in place of turns that no longer fit the history token budget
+    summary: Optional[str] = Field(default=None)
+    summary_message_id: Optional[int] = Field(default=None)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), sa_type=UTCDateTime)
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), sa_type=UTCDateTime)
     
     # Relationship
     messages: List["Message"] = Relationship(back_populates="conversation", cascade_delete=True)
@@ -90,7 +127,47 @@ class Message(SQLModel, table=True):
     conversation_id: str = Field(foreign_key="conversations.id", index=True)
     role: str = Field()  # "user" or "assistant"
     content: str = Field()
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), sa_type=UTCDateTime)
     
     # Relationship
     conversation: Optional[Conversation] = Relationship(back_populates="messages")
+
+
+class UserDataVersion(SQLModel, table=True):
+    """Per-user counter bumped by database triggers on every task or conversation write."""
+    __tablename__ = "user_data_versions"
+    
+    user_id: str = Field(primary_key=True)
+    version: int = Field(default=0, sa_type=BigInteger)
+
+
+class RevokedToken(SQLModel, table=True):
+    """Access tokens revoked before they expire (e.g. on logout), by SHA-256 hash."""
+    __tablename__ = "revoked_tokens"
+    
+    token_hash: str = Field(primary_key=True, max_length=64)
+    expires_at: datetime = Field(sa_type=UTCDateTime, index=True)
+
+
+class OutboxEvent(SQLModel, table=True):
+    """
+    An event waiting to be published, written in the same transaction as the change it describes.
+    
+    The relay in src/services/event_outbox.py publishes rows in id order
+    per user and deletes them once Dapr has accepted them.
+    """
+    __tablename__ = "event_outbox"
+    __table_args__ = (
+        # Finds earlier events of the same user that are waiting for a retry
+        Index("ix_event_outbox_user_id_id", "user_id", "id"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True, sa_type=BigInteger)
+    topic: str = Field(max_length=100)
+    user_id: Optional[str] = Field(default=None)
+    payload: Dict[str, Any] = Field(sa_column=Column(JSONB, nullable=False))
+    attempts: int = Field(default=0)
+    last_error: Optional[str] = Field(default=None)
+    # Not published before this time; pushed back after each failed attempt
+    available_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), sa_type=UTCDateTime)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), sa_type=UTCDateTime)
@@ -0,0 +1,148 @@
+"""Keyset (cursor) pagination helpers for task listings."""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import and_, or_, tuple_, asc, desc
+
+from .models import Task, Priority
+
+# Columns a task listing may be sorted by. Each one is backed by a
+# (user_id, <column>, id) composite index declared on the Task model.
+SORTABLE_COLUMNS = ("created_at", "updated_at", "due_date", "title", "priority", "id")
+DEFAULT_SORT = "created_at"
+# Search rank; only available when the listing has a search term
+RELEVANCE = "relevance"
+
+_DATETIME_COLUMNS = {"created_at", "updated_at", "due_date"}
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded or does not match the query."""
+
+
+def normalize_sort(sort_by: Optional[str], order: str, searching: bool = False) -> Tuple[str, str]:
+    """
+    Return a supported (sort_by, order) pair, falling back to the defaults.
+
+    Searches are ordered by relevance unless another sort is requested.
+    """
+    if searching and sort_by in (None, RELEVANCE):
+        sort_by = RELEVANCE
+    elif sort_by not in SORTABLE_COLUMNS:
+        sort_by = DEFAULT_SORT
+    order = "asc" if order.lower() == "asc" else "desc"
+    return sort_by, order
+
+
+def _dump_value(sort_by: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if sort_by in _DATETIME_COLUMNS:
+        return value.isoformat()
+    if sort_by == "priority":
+        return value.value if isinstance(value, Priority) else str(value)
+    return value
+
+
+def _load_value(sort_by: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if sort_by in _DATETIME_COLUMNS:
+        return datetime.fromisoformat(value)
+    if sort_by == "priority":
+        return Priority(value)
+    if sort_by == "id":
+        return int(value)
+    if sort_by == RELEVANCE:
+        return float(value)
+    return str(value)
+
+
+def encode_cursor(task: Task, sort_by: str, order: str, rank: Optional[float] = None) -> str:
+    """Build an opaque cursor pointing just after ``task`` in the given ordering."""
+    value = rank if sort_by == RELEVANCE else getattr(task, sort_by)
+    payload = [sort_by, order, _dump_value(sort_by, value), task.id]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, order: str) -> Tuple[Any, int]:
+    """Decode a cursor into (sort value, task id) for the given ordering."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, value, task_id = json.loads(
+            base64.urlsafe_b64decode(padded.encode("ascii"))
+        )
+        if cursor_sort != sort_by or cursor_order != order:
+            raise InvalidCursor("Cursor does not match the requested sort order")
+        return _load_value(sort_by, value), int(task_id)
+    except InvalidCursor:
+        raise
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+
+def _sort_column(sort_by: str, rank=None):
+    return rank if sort_by == RELEVANCE else getattr(Task, sort_by)
+
+
+def _nullable(sort_by: str) -> bool:
+    return sort_by == RELEVANCE or Task.__table__.c[sort_by].nullable
+
+
+def order_clause(sort_by: str, order: str, rank=None) -> tuple:
+    """ORDER BY terms for a listing; ``id`` breaks ties so the order is total."""
+    column = _sort_column(sort_by, rank)
+    direction = asc if order == "asc" else desc
+    if sort_by == "id":
+        return (direction(column),)
+    return (direction(column), direction(Task.id))
+
+
+def keyset_predicate(sort_by: str, order: str, value: Any, last_id: int, rank=None):
+    """
+    WHERE clause selecting the rows that come after (value, last_id).
+
+    Follows PostgreSQL's default NULL placement (NULLS LAST for ASC,
+    NULLS FIRST for DESC) so the predicate agrees with ``order_clause``
+    and a backward scan of the composite index serves both directions.
+    NULLs are only considered for nullable sort keys: the extra OR keeps
+    PostgreSQL (before 17) from using the row comparison as an index
+    condition.
+    """
+    column = _sort_column(sort_by, rank)
+
+    if sort_by == "id":
+        return Task.id > last_id if order == "asc" else Task.id < last_id
+
+    if order == "asc":
+        if value is None:
+            return and_(column.is_(None), Task.id > last_id)
+        after = tuple_(column, Task.id) > tuple_(value, last_id)
+        return or_(after, column.is_(None)) if _nullable(sort_by) else after
+
+    if value is None:
+        return or_(and_(column.is_(None), Task.id < last_id), column.is_not(None))
+    return tuple_(column, Task.id) < tuple_(value, last_id)
+
+
+def paginate(query, sort_by: str, order: str, cursor: Optional[str], limit: Optional[int], rank=None):
+    """
+    Apply ordering, the cursor predicate and the page limit to a task query.
+
+    ``rank`` is the relevance expression, required when sorting by relevance.
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_by, order)
+        query = query.where(keyset_predicate(sort_by, order, value, last_id, rank))
+
+    query = query.order_by(*order_clause(sort_by, order, rank))
+
+    if limit is not None:
+        # Fetch one extra row to learn whether another page exists
+        query = query.limit(limit + 1)
+    return query
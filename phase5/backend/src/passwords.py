@@ -0,0 +1,133 @@
+"""Password hashing on a bounded worker pool, off the event loop."""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+import bcrypt
+
+from .metrics import LatencyStats
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when every worker is busy and the queue is full."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a fixed number of worker threads.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    without the overhead of a process pool. At most ``max_queue`` calls wait
+    for a free worker; beyond that ``PasswordHasherBusy`` is raised at once
+    instead of letting a login burst queue up unbounded work.
+    """
+
+    def __init__(self, rounds: int = 12, workers: int = 2, max_queue: int = 8):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rejected = 0
+        self.hash_latency = LatencyStats()
+        self.verify_latency = LatencyStats()
+        self.queue_wait = LatencyStats()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+    @classmethod
+    def from_env(cls) -> "PasswordHasher":
+        """
+        Build the hasher from environment variables.
+
+        BCRYPT_ROUNDS           bcrypt cost factor (default 12); existing hashes
+                                are upgraded on the next successful login
+        PASSWORD_HASH_WORKERS   worker threads (default: CPU count, at most 4)
+        PASSWORD_HASH_QUEUE     calls allowed to wait for a worker (default 4 per worker)
+        """
+        workers = int(os.getenv("PASSWORD_HASH_WORKERS") or min(4, os.cpu_count() or 1))
+        return cls(
+            rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
+            workers=workers,
+            max_queue=int(os.getenv("PASSWORD_HASH_QUEUE") or workers * 4),
+        )
+
+    def hash_sync(self, password: str) -> str:
+        """Hash a password with the configured cost, on the calling thread."""
+        hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(self.rounds))
+        return hashed.decode("utf-8")
+
+    @staticmethod
+    def verify_sync(password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash, on the calling thread."""
+        try:
+            return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+        except Exception:
+            return False
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether a hash was made with a different cost than the configured one."""
+        try:
+            # $2b$<cost>$<salt and hash>
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def _run(self, latency: LatencyStats, func: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy("Password hashing is saturated")
+            self._in_flight += 1
+
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            self.queue_wait.record(started - submitted)
+            try:
+                return func(*args)
+            finally:
+                latency.record(time.perf_counter() - started)
+
+        future = self._executor.submit(job)
+        # Released when the work is done, even if the awaiting request is cancelled
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password on the worker pool."""
+        return await self._run(self.hash_latency, self.hash_sync, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify a password on the worker pool."""
+        return await self._run(self.verify_latency, self.verify_sync, password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy and hashing latency."""
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": in_flight,
+            "rejected": self.rejected,
+            **self.hash_latency.snapshot("hash_"),
+            **self.verify_latency.snapshot("verify_"),
+            **self.queue_wait.snapshot("queue_wait_"),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Singleton instance
+password_hasher = PasswordHasher.from_env()
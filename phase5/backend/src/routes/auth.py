@@ -1,22 +1,34 @@
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..database import get_session
+from ..database import get_async_session
 from ..models import User
 from ..schemas import UserCreate, UserLogin, UserResponse, Token, UserUpdate
-from ..auth import hash_password, verify_password, create_access_token, get_current_user
+from ..auth import create_access_token, decode_token, get_current_user, security
+from ..passwords import password_hasher, PasswordHasherBusy
+from ..token_cache import revoke_token
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many sign-in requests, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def signup(user_data: UserCreate, session: Session = Depends(get_session)):
+async def signup(user_data: UserCreate, session: AsyncSession = Depends(get_async_session)):
     """Register a new user."""
     # Check if email already exists
-    existing_user = session.exec(
+    existing_user = (await session.exec(
         select(User).where(User.email == user_data.email)
-    ).first()
+    )).first()
     
     if existing_user:
         raise HTTPException(
@@ -24,28 +36,34 @@ async def signup(user_data: UserCreate, session: Session = Depends(get_session))
             detail="Email already registered"
         )
     
+    # Hash off the event loop; bcrypt takes hundreds of milliseconds
+    try:
+        password_hash = await password_hasher.hash(user_data.password)
+    except PasswordHasherBusy:
+        raise _hashing_busy()
+    
     # Create new user
     new_user = User(
         id=str(uuid.uuid4()),
         email=user_data.email,
         username=user_data.username,
-        password_hash=hash_password(user_data.password)
+        password_hash=password_hash
     )
     
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    await session.commit()
+    await session.refresh(new_user)
     
     return new_user
 
 
 @router.post("/login", response_model=Token)
-async def login(credentials: UserLogin, session: Session = Depends(get_session)):
+async def login(credentials: UserLogin, session: AsyncSession = Depends(get_async_session)):
     """Authenticate user and return access token."""
     # Find user by email
-    user = session.exec(
+    user = (await session.exec(
         select(User).where(User.email == credentials.email)
-    ).first()
+    )).first()
     
     if not user:
         raise HTTPException(
@@ -53,26 +71,52 @@ async def login(credentials: UserLogin, session: Session = Depends(get_session))
             detail="Invalid email or password"
         )
     
-    # Verify password
-    if not verify_password(credentials.password, user.password_hash):
+    # Verify password (off the event loop)
+    try:
+        valid = await password_hasher.verify(credentials.password, user.password_hash)
+    except PasswordHasherBusy:
+        raise _hashing_busy()
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
+    # Upgrade hashes made with a different cost while we have the password
+    if password_hasher.needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await password_hasher.hash(credentials.password)
+            session.add(user)
+            await session.commit()
+        except PasswordHasherBusy:
+            pass  # Retried on the next login
+    
     # Create access token
     access_token = create_access_token(user_id=user.id)
     
     return Token(access_token=access_token)
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    session: AsyncSession = Depends(get_async_session),
+    user_id: str = Depends(get_current_user)
+):
+    """Revoke the current access token on every server until it expires."""
+    payload = decode_token(credentials.credentials)
+    if payload is not None and "exp" in payload:
+        await revoke_token(session, credentials.credentials, payload["exp"])
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     user_id: str = Depends(get_current_user)
 ):
     """Get current authenticated user's information."""
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -86,11 +130,11 @@ async def get_current_user_info(
 @router.patch("/me", response_model=UserResponse)
 async def update_current_user_info(
     user_data: UserUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     user_id: str = Depends(get_current_user)
 ):
     """Update current authenticated user's information."""
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -104,9 +148,9 @@ async def update_current_user_info(
         
     if user_data.email is not None and user_data.email != user.email:
         # Check if new email is already taken
-        existing_email = session.exec(
+        existing_email = (await session.exec(
             select(User).where(User.email == user_data.email)
-        ).first()
+        )).first()
         if existing_email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -115,7 +159,7 @@ async def update_current_user_info(
         user.email = user_data.email
         
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
     
     return user
@@ -1,23 +1,114 @@
 """Chat API endpoint for conversational task management."""
 
-from typing import Optional
+import json
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Header, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..database import get_session
+from ..database import get_async_session, async_session_factory
 from ..models import Conversation, Message
 from ..schemas import ChatRequest, ChatResponse
 from ..auth import get_current_user
-from ..agent.client import run_agent
+from ..agent.client import run_agent, stream_agent
+from ..agent.memory import build_history, refresh_summary, HISTORY_MAX_MESSAGES
+from ..data_version import get_data_version, make_etag, etag_matches, conditional_headers, not_modified
 
 router = APIRouter(prefix="/api/chat", tags=["Chat"])
 
 
+async def _start_turn(session: AsyncSession, user_id: str, request: ChatRequest):
+    """
+    Get or create the conversation, load its history and store the user message.
+    
+    Returns the conversation, the history (before the new message) in the
+    agent's format, trimmed to the token budget, and the message id to pass
+    to ``refresh_summary`` when the summary needs to catch up (else None).
+    """
+    # Get or create conversation
+    if request.conversation_id:
+        # Verify conversation belongs to user (security)
+        conversation = (await session.exec(
+            select(Conversation).where(
+                Conversation.id == request.conversation_id,
+                Conversation.user_id == user_id
+            )
+        )).first()
+        
+        if not conversation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found"
+            )
+    else:
+        # Create new conversation
+        conversation = Conversation(user_id=user_id)
+        session.add(conversation)
+        await session.commit()
+        await session.refresh(conversation)
+    
+    # Fetch recent conversation history; older turns live on in the summary
+    messages = (await session.exec(
+        select(Message)
+        .where(Message.conversation_id == conversation.id)
+        .order_by(Message.created_at.desc())
+        .limit(HISTORY_MAX_MESSAGES)
+    )).all()
+    
+    # Reverse to chronological order and trim to the token budget
+    conversation_history, summarize_before = build_history(
+        list(reversed(messages)), conversation.summary, conversation.summary_message_id
+    )
+    
+    # Store user message
+    user_message = Message(
+        conversation_id=conversation.id,
+        role="user",
+        content=request.message
+    )
+    session.add(user_message)
+    await session.commit()
+    
+    return conversation, conversation_history, summarize_before
+
+
+async def _finish_turn(
+    session: AsyncSession, conversation: Conversation, user_message: str, reply: str
+) -> Message:
+    """Store the assistant reply and update the conversation."""
+    assistant_message = Message(
+        conversation_id=conversation.id,
+        role="assistant",
+        content=reply
+    )
+    session.add(assistant_message)
+    
+    # Update conversation timestamp
+    conversation.updated_at = datetime.now(timezone.utc)
+    
+    # Auto-generate title from first message if not set
+    if not conversation.title and user_message:
+        # Use first 50 chars of first user message as title
+        conversation.title = user_message[:50] + ("..." if len(user_message) > 50 else "")
+    
+    session.add(conversation)
+    await session.commit()
+    return assistant_message
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
 @router.post("", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    session: Session = Depends(get_session),
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_async_session),
     user_id: str = Depends(get_current_user)
 ):
     """
@@ -32,79 +123,23 @@ async def chat(
     6. Return response and conversation_id
     """
     try:
-        # Step 1: Get or create conversation
-        if request.conversation_id:
-            # Verify conversation belongs to user (security)
-            conversation = session.exec(
-                select(Conversation).where(
-                    Conversation.id == request.conversation_id,
-                    Conversation.user_id == user_id
-                )
-            ).first()
-            
-            if not conversation:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Conversation not found"
-                )
-        else:
-            # Create new conversation
-            conversation = Conversation(user_id=user_id)
-            session.add(conversation)
-            session.commit()
-            session.refresh(conversation)
-        
-        # Step 2: Fetch conversation history (last 50 messages for context)
-        messages = session.exec(
-            select(Message)
-            .where(Message.conversation_id == conversation.id)
-            .order_by(Message.created_at.desc())
-            .limit(50)
-        ).all()
-        
-        # Reverse to chronological order
-        messages = list(reversed(messages))
-        
-        # Format history for agent
-        conversation_history = [
-            {"role": msg.role, "content": msg.content}
-            for msg in messages
-        ]
+        # Steps 1-3
+        conversation, conversation_history, summarize_before = await _start_turn(session, user_id, request)
         
-        # Step 3: Store user message
-        user_message = Message(
-            conversation_id=conversation.id,
-            role="user",
-            content=request.message
-        )
-        session.add(user_message)
-        session.commit()
-        
-        # Step 4: Run agent
-        agent_response = run_agent(
+        # Step 4: Run agent (blocking LLM and tool calls, so off the event loop)
+        agent_response = await run_in_threadpool(
+            run_agent,
             user_id=user_id,
             message=request.message,
             conversation_history=conversation_history
         )
         
         # Step 5: Store assistant response
-        assistant_message = Message(
-            conversation_id=conversation.id,
-            role="assistant",
-            content=agent_response
-        )
-        session.add(assistant_message)
+        await _finish_turn(session, conversation, request.message, agent_response)
         
-        # Update conversation timestamp
-        conversation.updated_at = datetime.now(timezone.utc)
-        
-        # Auto-generate title from first message if not set
-        if not conversation.title and request.message:
-            # Use first 50 chars of first user message as title
-            conversation.title = request.message[:50] + ("..." if len(request.message) > 50 else "")
-        
-        session.add(conversation)
-        session.commit()
+        # Fold turns that no longer fit the budget into the summary, after responding
+        if summarize_before is not None:
+            background_tasks.add_task(refresh_summary, conversation.id, summarize_before)
         
         # Step 6: Return response
         return ChatResponse(
@@ -121,17 +156,74 @@ async def chat(
         )
 
 
+async def _stream_turn(
+    user_id: str, conversation_id: str, message: str, conversation_history: List[Dict[str, str]]
+) -> AsyncIterator[str]:
+    yield _sse("conversation", {"conversation_id": conversation_id})
+    async for event in stream_agent(user_id, message, conversation_history):
+        if event["type"] != "done":
+            yield _sse(event["type"], {key: value for key, value in event.items() if key != "type"})
+            continue
+        # The generator runs after the handler returned, so it needs its own session
+        async with async_session_factory() as session:
+            conversation = await session.get(Conversation, conversation_id)
+            assistant_message = await _finish_turn(session, conversation, message, event["content"])
+        yield _sse("done", {
+            "conversation_id": conversation_id,
+            "message_id": assistant_message.id,
+            "content": event["content"]
+        })
+
+
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    session: AsyncSession = Depends(get_async_session),
+    user_id: str = Depends(get_current_user)
+):
+    """
+    Streaming variant of the chat endpoint, as server-sent events.
+    
+    Emits ``conversation`` first, then ``token``, ``tool_call``,
+    ``tool_result`` and ``error`` events as the agent produces them, and
+    ``done`` with the final reply once it is stored. A client that
+    disconnects early stops the agent and no reply is stored.
+    """
+    conversation, conversation_history, summarize_before = await _start_turn(session, user_id, request)
+    return StreamingResponse(
+        _stream_turn(user_id, conversation.id, request.message, conversation_history),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=(
+            BackgroundTask(refresh_summary, conversation.id, summarize_before)
+            if summarize_before is not None else None
+        )
+    )
+
+
 @router.get("/conversations", response_model=list)
 async def list_conversations(
-    session: Session = Depends(get_session),
-    user_id: str = Depends(get_current_user)
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
+    user_id: str = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
 ):
-    """Get all conversations for the current user."""
-    conversations = session.exec(
+    """
+    Get all conversations for the current user.
+    
+    A matching ``If-None-Match`` is answered with 304 without querying.
+    """
+    etag = make_etag("conversations", user_id, await get_data_version(session, user_id))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers.update(conditional_headers(etag))
+    
+    conversations = (await session.exec(
         select(Conversation)
         .where(Conversation.user_id == user_id)
         .order_by(Conversation.updated_at.desc())
-    ).all()
+    )).all()
     
     return [
         {
@@ -147,17 +239,17 @@ async def list_conversations(
 @router.get("/conversations/{conversation_id}/messages", response_model=list)
 async def get_conversation_messages(
     conversation_id: str,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     user_id: str = Depends(get_current_user)
 ):
     """Get all messages for a conversation."""
     # Verify conversation belongs to user
-    conversation = session.exec(
+    conversation = (await session.exec(
         select(Conversation).where(
             Conversation.id == conversation_id,
             Conversation.user_id == user_id
         )
-    ).first()
+    )).first()
     
     if not conversation:
         raise HTTPException(
@@ -165,11 +257,11 @@ async def get_conversation_messages(
             detail="Conversation not found"
         )
     
-    messages = session.exec(
+    messages = (await session.exec(
         select(Message)
         .where(Message.conversation_id == conversation_id)
         .order_by(Message.created_at.asc())
-    ).all()
+    )).all()
     
     return [
         {
@@ -185,16 +277,16 @@ async def get_conversation_messages(
 @router.delete("/conversations/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_conversation(
     conversation_id: str,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     user_id: str = Depends(get_current_user)
 ):
     """Delete a conversation and all its messages."""
-    conversation = session.exec(
+    conversation = (await session.exec(
         select(Conversation).where(
             Conversation.id == conversation_id,
             Conversation.user_id == user_id
         )
-    ).first()
+    )).first()
     
     if not conversation:
         raise HTTPException(
@@ -202,6 +294,6 @@ async def delete_conversation(
             detail="Conversation not found"
         )
     
-    session.delete(conversation)
-    session.commit()
+    await session.delete(conversation)
+    await session.commit()
     return None
@@ -1,125 +1,339 @@
 from typing import Optional, List
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import Session, select, or_, desc, asc
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..database import get_session
-from ..models import Task, Priority, RecurrencePattern
-from ..schemas import TaskCreate, TaskUpdate, TaskResponse
+from ..database import get_async_session
+from ..models import Task, Priority
+from ..schemas import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskBatchRequest,
+    TaskBatchResponse,
+    TaskImportResponse,
+)
 from ..auth import get_current_user
-from ..services import event_publisher, RecurringTaskService
+from ..services import (
+    event_publisher,
+    enqueue_event,
+    outbox_relay,
+    RecurringTaskService,
+    TaskBatchService,
+    build_task,
+    parse_task_update,
+    update_tasks_statement,
+    delete_tasks_statement,
+    task_cache,
+)
+from ..pagination import InvalidCursor, normalize_sort, paginate, encode_cursor
+from ..tags import parse_tag_filter, tag_filter_clause
+from ..search import build_tsquery, search_clause, search_columns, rank_expression
+from ..services.task_export import EXPORT_FORMATS, accepts_gzip, stream_task_export
+from ..services.task_import import TaskImporter, get_import_progress, iter_lines
+from ..data_version import (
+    get_data_version,
+    make_etag,
+    etag_matches,
+    if_match_versions,
+    conditional_headers,
+    not_modified,
+)
 
 router = APIRouter(prefix="/api/tasks", tags=["Tasks"])
 
+MAX_PAGE_SIZE = 500
+
+_task_list_adapter = TypeAdapter(List[TaskResponse])
+
 
 @router.get("", response_model=List[TaskResponse])
 async def get_tasks(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     user_id: str = Depends(get_current_user),
     status_filter: Optional[str] = Query(None, alias="status"),
     priority_filter: Optional[str] = Query(None, alias="priority"),
-    tag_filter: Optional[str] = Query(None, alias="tag"),
+    tag_filter: Optional[List[str]] = Query(None, alias="tag"),
+    tag_mode: str = Query("any", pattern="^(any|all)$"),
     search: Optional[str] = Query(None),
-    sort_by: str = Query("created_at"),
-    order: str = Query("desc")
+    sort_by: Optional[str] = Query(None),
+    order: str = Query("desc"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None)
 ):
-    """Get all tasks for the current user with filtering and sorting."""
-    query = select(Task).where(Task.user_id == user_id)
+    """
+    Get tasks for the current user with filtering and sorting.
+
+    ``tag`` may be repeated or comma-separated; ``tag_mode`` selects whether a
+    task must carry any or all of the given tags. ``search`` runs a prefix
+    full-text search over title and description; results are ranked by
+    relevance (unless ``sort_by`` says otherwise) and carry highlights.
+    Pass ``limit`` to page through the results; when more tasks follow, the
+    cursor for the next page is returned in the ``X-Next-Cursor`` header.
+
+    Listings are served from the task cache until the user's tasks change.
+    The response carries the user's data version as its ETag; a matching
+    ``If-None-Match`` is answered with 304 before any listing work.
+    """
+    version = await get_data_version(session, user_id)
+    etag = make_etag("tasks", user_id, version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     
-    # Apply status filter
+    # Normalize the filters so equivalent requests share a cache entry
     if status_filter == "completed":
-        query = query.where(Task.completed == True)
+        completed = True
     elif status_filter == "active" or status_filter == "pending":
-        query = query.where(Task.completed == False)
+        completed = False
+    else:
+        completed = None
     
-    # Apply priority filter
+    priority = None
     if priority_filter and priority_filter.lower() in ["high", "medium", "low"]:
-        try:
-            query = query.where(Task.priority == Priority(priority_filter.lower()))
-        except ValueError:
-            pass
-        
-    # Apply search filter
-    if search:
-        search_filter = f"%{search}%"
-        query = query.where(
-            or_(
-                Task.title.ilike(search_filter),
-                Task.description.ilike(search_filter)
-            )
+        priority = priority_filter.lower()
+    
+    tags = parse_tag_filter(tag_filter)
+    search = search.lower() if search else None
+    sort_by, order = normalize_sort(sort_by, order, searching=search is not None)
+    
+    params = {
+        "completed": completed,
+        "priority": priority,
+        "tags": sorted(tags),
+        "tag_mode": tag_mode if tags else None,
+        "search": search,
+        "sort_by": sort_by,
+        "order": order,
+        "limit": limit,
+        "cursor": cursor,
+        # The body may be newer than the version it is cached under, but
+        # never older, so an ETag never vouches for stale data
+        "version": version,
+    }
+    
+    async def load():
+        return await _load_task_list(
+            session, user_id, completed, priority, tags, tag_mode,
+            search, sort_by, order, limit, cursor
         )
-        
-    # Apply sorting
-    sort_column = getattr(Task, sort_by, Task.created_at)
-    if order.lower() == "asc":
-        query = query.order_by(asc(sort_column))
+    
+    page = await task_cache.aget_or_load(user_id, "api", params, load)
+    
+    headers = conditional_headers(etag)
+    if page["next_cursor"]:
+        headers["X-Next-Cursor"] = page["next_cursor"]
+    return Response(content=page["body"], media_type="application/json", headers=headers)
+
+
+async def _load_task_list(
+    session: AsyncSession,
+    user_id: str,
+    completed: Optional[bool],
+    priority: Optional[str],
+    tags: List[str],
+    tag_mode: str,
+    search: Optional[str],
+    sort_by: str,
+    order: str,
+    limit: Optional[int],
+    cursor: Optional[str]
+) -> dict:
+    """Query one page of tasks; returns the JSON body and the next cursor."""
+    # Full-text search adds its rank and highlight columns to the select
+    tsquery = None
+    if search:
+        tsquery = build_tsquery(search)
+        if tsquery is None:
+            return {"body": "[]", "next_cursor": None}
+        query = select(Task, *search_columns(tsquery)).where(search_clause(tsquery))
     else:
-        query = query.order_by(desc(sort_column))
+        query = select(Task)
+    
+    query = query.where(Task.user_id == user_id)
+    
+    # Apply status filter
+    if completed is not None:
+        query = query.where(Task.completed == completed)
+    
+    # Apply priority filter
+    if priority:
+        query = query.where(Task.priority == Priority(priority))
+    
+    # Apply tag filter
+    if tags:
+        query = query.where(tag_filter_clause(tags, tag_mode))
+        
+    # Apply sorting and keyset pagination
+    try:
+        query = paginate(
+            query, sort_by, order, cursor, limit,
+            rank=rank_expression(tsquery) if tsquery is not None else None
+        )
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
         
-    tasks = session.exec(query).all()
+    rows = (await session.exec(query)).all()
     
-    # Apply tag filter (post-query for ARRAY)
-    if tag_filter:
-        tasks = [t for t in tasks if t.tags and tag_filter.lower() in [tag.lower() for tag in t.tags]]
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if tsquery is None:
+            next_cursor = encode_cursor(last, sort_by, order)
+        else:
+            next_cursor = encode_cursor(last[0], sort_by, order, rank=last[1])
+    
+    if tsquery is None:
+        tasks = [TaskResponse.model_validate(task) for task in rows]
+    else:
+        tasks = [
+            TaskResponse.model_validate(task).model_copy(update={
+                "rank": rank,
+                "title_highlight": title_highlight,
+                "description_snippet": description_snippet or None
+            })
+            for task, rank, title_highlight, description_snippet in rows
+        ]
     
-    return tasks
+    return {"body": _task_list_adapter.dump_json(tasks).decode("utf-8"), "next_cursor": next_cursor}
 
 
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_data: TaskCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     user_id: str = Depends(get_current_user)
 ):
     """Create a new task for the current user."""
-    # Parse priority
-    task_priority = Priority.medium
-    if task_data.priority:
-        try:
-            task_priority = Priority(task_data.priority.lower())
-        except ValueError:
-            task_priority = Priority.medium
-    
-    # Parse recurrence pattern
-    recurrence_pattern = None
-    if task_data.is_recurring and task_data.recurrence_pattern:
-        try:
-            recurrence_pattern = RecurrencePattern(task_data.recurrence_pattern.lower())
-        except ValueError:
-            pass
-    
-    new_task = Task(
-        user_id=user_id,
-        title=task_data.title,
-        description=task_data.description,
-        priority=task_priority,
-        tags=task_data.tags,
-        due_date=task_data.due_date,
-        is_recurring=task_data.is_recurring or False,
-        recurrence_pattern=recurrence_pattern,
-        recurrence_end_date=task_data.recurrence_end_date
-    )
+    new_task = build_task(user_id, task_data)
     
     session.add(new_task)
-    session.commit()
-    session.refresh(new_task)
-    
-    # Publish task created event
-    await event_publisher.publish_task_created(new_task)
+    await session.flush()
+    # The task created event is committed with the task and published by the relay
+    enqueue_event(session, event_publisher.task_created_event(new_task))
+    await session.commit()
+    await session.refresh(new_task)
+    await task_cache.ainvalidate(user_id)
+    outbox_relay.wake()
     
     return new_task
 
 
+@router.post("/batch", response_model=TaskBatchResponse)
+async def batch_tasks(
+    batch: TaskBatchRequest,
+    session: AsyncSession = Depends(get_async_session),
+    user_id: str = Depends(get_current_user)
+):
+    """
+    Create, update and delete many tasks in one transaction.
+    
+    Returns one result per operation, in request order, with the status the
+    equivalent single-task request would have returned. Events for all
+    changes are written to the outbox in the same transaction.
+    """
+    batch_service = TaskBatchService(session, user_id)
+    try:
+        results = await batch_service.run(batch.operations)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    await task_cache.ainvalidate(user_id)
+    outbox_relay.wake()
+    
+    return TaskBatchResponse(results=results)
+
+
+@router.get("/export")
+async def export_tasks(
+    user_id: str = Depends(get_current_user),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    after_id: Optional[int] = Query(None, ge=0),
+    accept_encoding: Optional[str] = Header(None)
+):
+    """
+    Stream all of the current user's tasks as NDJSON or CSV, ordered by id.
+    
+    The export is streamed from a server-side cursor in constant memory and
+    gzip-compressed on the fly when the client accepts it. To resume an
+    interrupted export, pass the id of the last task received as ``after_id``.
+    """
+    compress = accepts_gzip(accept_encoding)
+    headers = {
+        "Content-Disposition": f'attachment; filename="tasks.{export_format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    
+    return StreamingResponse(
+        stream_task_export(user_id, export_format, after_id, compress),
+        media_type=EXPORT_FORMATS[export_format],
+        headers=headers
+    )
+
+
+@router.post("/import", response_model=TaskImportResponse)
+async def import_tasks(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+    user_id: str = Depends(get_current_user),
+    import_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    import_id: Optional[str] = Query(None, min_length=1, max_length=100)
+):
+    """
+    Bulk-import tasks from a streamed NDJSON or CSV request body.
+    
+    Rows are validated and loaded with COPY in chunks as the body arrives;
+    invalid rows are reported by row number and skipped. A single
+    tasks.imported event is published instead of one task.created per task.
+    Pass an ``import_id`` to follow progress via ``GET /api/tasks/import/{import_id}``.
+    """
+    importer = TaskImporter(session, user_id, import_id)
+    report = await importer.run(iter_lines(request.stream()), import_format)
+    
+    if report.imported:
+        await task_cache.ainvalidate(user_id)
+        outbox_relay.wake()
+    
+    return report
+
+
+@router.get("/import/{import_id}", response_model=TaskImportResponse)
+async def get_import(
+    import_id: str,
+    user_id: str = Depends(get_current_user)
+):
+    """Progress of a running import, or the report of a recent one."""
+    progress = get_import_progress(user_id, import_id)
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import not found"
+        )
+    return progress
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: int,
-    session: Session = Depends(get_session),
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
     user_id: str = Depends(get_current_user)
 ):
-    """Get a specific task by ID."""
-    task = session.exec(
+    """Get a specific task by ID. The ETag carries its version, for If-Match."""
+    task = (await session.exec(
         select(Task).where(Task.id == task_id, Task.user_id == user_id)
-    ).first()
+    )).first()
     
     if not task:
         raise HTTPException(
@@ -127,6 +341,7 @@ async def get_task(
             detail="Task not found"
         )
     
+    response.headers.update(conditional_headers(make_etag("task", user_id, task.version)))
     return task
 
 
@@ -134,52 +349,59 @@ async def get_task(
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
-    session: Session = Depends(get_session),
-    user_id: str = Depends(get_current_user)
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
+    user_id: str = Depends(get_current_user),
+    if_match: Optional[str] = Header(None)
 ):
-    """Update a task. Can only update own tasks."""
-    task = session.exec(
-        select(Task).where(Task.id == task_id, Task.user_id == user_id)
-    ).first()
-    
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-    
-    # Store old completed status for event
-    old_completed = task.completed
+    """
+    Update a task. Can only update own tasks.
     
+    With ``If-Match`` (the task's ETag) the update only applies if nobody
+    changed the task since it was read; otherwise 412 is returned with the
+    current ETag.
+    """
     # Update fields if provided
-    update_data = task_data.model_dump(exclude_unset=True)
-    
-    # Parse recurrence pattern if provided
-    if "recurrence_pattern" in update_data and update_data["recurrence_pattern"]:
-        try:
-            update_data["recurrence_pattern"] = RecurrencePattern(update_data["recurrence_pattern"].lower())
-        except ValueError:
-            update_data.pop("recurrence_pattern")
-    
-    for key, value in update_data.items():
-        setattr(task, key, value)
+    update_data = parse_task_update(task_data)
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
-    task.updated_at = datetime.now(timezone.utc)
+    # One UPDATE ... RETURNING, which also reports the old completed status
+    row = (await session.exec(update_tasks_statement(
+        user_id, [task_id], update_data,
+        expected_versions=if_match_versions(if_match, "task", user_id)
+    ))).first()
     
-    session.add(task)
-    session.commit()
-    session.refresh(task)
+    if not row:
+        current_version = (await session.exec(
+            select(Task.version).where(Task.id == task_id, Task.user_id == user_id)
+        )).first()
+        if current_version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Task was modified by another request",
+            headers=conditional_headers(make_etag("task", user_id, current_version))
+        )
     
-    # Publish task updated event
-    await event_publisher.publish_task_updated(task, old_completed)
+    task, old_completed = row
+    enqueue_event(session, event_publisher.task_updated_event(task, old_completed))
     
-    # If task was just completed and is recurring, create next instance
+    # If task was just completed and is recurring, create next instance in
+    # the same transaction
     if task.completed and not old_completed and task.is_recurring:
-        recurring_service = RecurringTaskService(session)
-        next_instance = recurring_service.create_next_instance(task)
+        next_instance = RecurringTaskService(session).build_next_instance(task)
         if next_instance:
-            # Publish event for the new instance
-            await event_publisher.publish_task_created(next_instance)
+            session.add(next_instance)
+            await session.flush()
+            enqueue_event(session, event_publisher.task_created_event(next_instance))
+    
+    await session.commit()
+    await task_cache.ainvalidate(user_id)
+    outbox_relay.wake()
+    response.headers.update(conditional_headers(make_etag("task", user_id, task.version)))
     
     return task
 
@@ -187,24 +409,21 @@ async def update_task(
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
     task_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     user_id: str = Depends(get_current_user)
 ):
     """Delete a task. Can only delete own tasks."""
-    task = session.exec(
-        select(Task).where(Task.id == task_id, Task.user_id == user_id)
-    ).first()
+    deleted = (await session.exec(delete_tasks_statement(user_id, [task_id]))).first()
     
-    if not task:
+    if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    # Publish task deleted event before deletion
-    await event_publisher.publish_task_deleted(task.id, user_id)
-    
-    session.delete(task)
-    session.commit()
+    enqueue_event(session, event_publisher.task_deleted_event(task_id, user_id))
+    await session.commit()
+    await task_cache.ainvalidate(user_id)
+    outbox_relay.wake()
     
     return None
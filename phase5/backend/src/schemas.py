@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import Optional, Literal, Union, Annotated
 from datetime import datetime
 
 
@@ -83,6 +83,12 @@ class TaskResponse(BaseModel):
     parent_task_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
+    # Row version; send it back in If-Match for conditional updates
+    version: int = 1
+    # Populated only for search results
+    rank: Optional[float] = None
+    title_highlight: Optional[str] = None
+    description_snippet: Optional[str] = None
 
 
     class Config:
@@ -90,6 +96,70 @@ class TaskResponse(BaseModel):
 
 
 
+# ============ Batch Task Schemas ============
+
+class TaskBatchCreate(BaseModel):
+    op: Literal["create"]
+    data: TaskCreate
+
+
+class TaskBatchUpdate(BaseModel):
+    op: Literal["update"]
+    id: int
+    data: TaskUpdate
+
+
+class TaskBatchDelete(BaseModel):
+    op: Literal["delete"]
+    id: int
+
+
+TaskBatchOperation = Annotated[
+    Union[TaskBatchCreate, TaskBatchUpdate, TaskBatchDelete],
+    Field(discriminator="op")
+]
+
+
+class TaskBatchRequest(BaseModel):
+    operations: list[TaskBatchOperation] = Field(..., min_length=1, max_length=1000)
+
+
+class TaskBatchResult(BaseModel):
+    """Outcome of one batch operation, in request order."""
+    index: int
+    op: str
+    status: int  # HTTP status the equivalent single-task request would return
+    task_id: Optional[int] = None
+    task: Optional[TaskResponse] = None
+    error: Optional[str] = None
+
+
+class TaskBatchResponse(BaseModel):
+    results: list[TaskBatchResult]
+
+
+# ============ Task Import Schemas ============
+
+class TaskImportRow(TaskCreate):
+    """One imported task; migrated tasks may already be completed."""
+    completed: Optional[bool] = Field(default=False)
+
+
+class TaskImportError(BaseModel):
+    row: int
+    error: str
+
+
+class TaskImportResponse(BaseModel):
+    import_id: str
+    status: Literal["running", "completed", "failed"]
+    rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: list[TaskImportError] = []
+    errors_truncated: bool = False
+
+
 # ============== Chat Schemas ==============
 
 class ChatRequest(BaseModel):
@@ -0,0 +1,106 @@
+"""Full-text search over task titles and descriptions."""
+
+import re
+from typing import Optional
+
+from sqlalchemy import Float, cast, func, literal, literal_column, text
+
+from .models import Task
+
+# Text search configuration used for both the stored vector and queries
+SEARCH_CONFIG = "english"
+
+# tasks.search_vector is a generated column (see SCHEMA_UPGRADES in
+# database.py), so PostgreSQL keeps it in sync with title and description.
+# Titles weigh more than descriptions when ranking.
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+)
+
+# Not mapped on the Task model so that listings don't load it
+search_vector = literal_column("tasks.search_vector")
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+_HIGHLIGHT_OPTIONS = "StartSel=<mark>, StopSel=</mark>, HighlightAll=true"
+_SNIPPET_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=20, MinWords=8, MaxFragments=2"
+
+
+# HTML-escaped before highlighting, so <mark> is the only markup in the output
+_HTML_ESCAPES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#39;"))
+
+
+# Whether pg_trgm is installed (see SCHEMA_UPGRADES); checked once per process
+_trigram_support: Optional[bool] = None
+
+
+def build_tsquery(term: str, match_all: bool = True):
+    """
+    Turn free-form user input into a prefix-matching tsquery.
+
+    Every word is treated as a prefix and, with ``match_all``, must match,
+    so "gro mil" finds "Buy groceries and milk". Without it any word may
+    match and tasks matching more words rank higher. Returns None when the
+    input has no words.
+    """
+    words = _WORD.findall(term.lower())
+    if not words:
+        return None
+    operator = " & " if match_all else " | "
+    return func.to_tsquery(SEARCH_CONFIG, operator.join(f"{word}:*" for word in words))
+
+
+def search_clause(tsquery):
+    """WHERE clause matching tasks against ``tsquery`` via the GIN index."""
+    return search_vector.op("@@")(tsquery)
+
+
+def rank_expression(tsquery):
+    """Relevance of a task for ``tsquery``, as double precision so cursors round-trip exactly."""
+    return cast(func.ts_rank(search_vector, tsquery), Float)
+
+
+def _html_escape(column):
+    # & first, so the entities added after it are not escaped again
+    for char, entity in _HTML_ESCAPES:
+        column = func.replace(column, char, entity)
+    return column
+
+
+def search_columns(tsquery) -> tuple:
+    """
+    Rank, highlighted title and description snippet columns for a search query.
+
+    The title and description are HTML-escaped before matches are wrapped
+    in ``<mark>``, so the highlights are safe to render as HTML.
+    """
+    return (
+        rank_expression(tsquery).label("rank"),
+        func.ts_headline(
+            SEARCH_CONFIG, _html_escape(Task.title), tsquery, _HIGHLIGHT_OPTIONS
+        ).label("title_highlight"),
+        func.ts_headline(
+            SEARCH_CONFIG, _html_escape(func.coalesce(Task.description, "")), tsquery, _SNIPPET_OPTIONS
+        ).label("description_snippet"),
+    )
+
+
+def has_trigram_support(session) -> bool:
+    """Whether the pg_trgm extension is available for fuzzy title matching."""
+    global _trigram_support
+    if _trigram_support is None:
+        _trigram_support = session.exec(
+            text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        ).scalar()
+    return _trigram_support
+
+
+def title_similarity(term: str):
+    """Trigram similarity (0-1) of ``term`` to the closest part of a task title. Needs pg_trgm."""
+    return cast(func.word_similarity(literal(term), Task.title), Float)
+
+
+def title_similarity_clause(term: str):
+    """WHERE clause for titles similar to ``term``, via the trigram index. Needs pg_trgm."""
+    return literal(term).op("<%")(Task.title)
@@ -1,5 +1,15 @@
 """Services package initialization."""
 from src.services.event_publisher import event_publisher
+from src.services.event_outbox import enqueue_event, enqueue_events, outbox_relay
 from src.services.recurring_task_service import RecurringTaskService
+from src.services.task_batch import (
+    TaskBatchService,
+    build_task,
+    parse_task_update,
+    update_tasks_statement,
+    delete_tasks_statement,
+)
+from src.services.task_cache import task_cache, TaskListCache
 
-__all__ = ["event_publisher", "RecurringTaskService"]
+__all__ = ["event_publisher", "enqueue_event", "enqueue_events", "outbox_relay", "RecurringTaskService", "TaskBatchService", "build_task", "parse_task_update",
+           "update_tasks_statement", "delete_tasks_statement", "task_cache", "TaskListCache"]
@@ -0,0 +1,244 @@
+"""Transactional outbox for task events, drained to Dapr by a background relay."""
+import asyncio
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, exists, func
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.database import async_session_factory
+from src.metrics import LatencyStats
+from src.models import OutboxEvent
+from src.services.event_publisher import EventPublisher, event_publisher
+
+TASK_EVENTS_TOPIC = "task-events"
+# Transaction-level advisory lock held while draining, so one relay (on
+# any replica) publishes at a time and per-user order is kept
+OUTBOX_LOCK_KEY = 0x6F7574626F78  # "outbox"
+
+
+def enqueue_events(session: AsyncSession, events: Iterable[Dict[str, Any]], topic: str = TASK_EVENTS_TOPIC) -> None:
+    """
+    Add events to the outbox in the session's transaction.
+
+    They are published after the transaction commits, and not at all if it
+    rolls back. Call ``outbox_relay.wake()`` after committing to publish
+    them right away instead of at the next poll.
+    """
+    for event in events:
+        session.add(OutboxEvent(topic=topic, user_id=event.get("user_id"), payload=event))
+
+
+def enqueue_event(session: AsyncSession, event: Dict[str, Any], topic: str = TASK_EVENTS_TOPIC) -> None:
+    """Add one event to the outbox in the session's transaction."""
+    enqueue_events(session, [event], topic)
+
+
+class OutboxRelay:
+    """
+    Publishes outbox rows to Dapr, oldest first, and deletes them once accepted.
+
+    Delivery is at least once: a row is deleted in the transaction that
+    published it, so a crash between the two publishes it again. Each event
+    carries its outbox id as ``event_id`` for consumers that deduplicate.
+
+    Events of one user are published in order. A failed event is retried
+    with exponential backoff, and later events of the same user wait for
+    it. Events of different users are published concurrently.
+
+    When the publisher uses Dapr's bulk API, each batch goes out in one
+    request per topic. If an entry fails, the user's later entries in that
+    request may have been accepted already; they stay in the outbox and are
+    published again after the failed one, so the last copy a consumer sees
+    is still in order.
+    """
+
+    def __init__(
+        self,
+        publisher: EventPublisher,
+        session_factory=async_session_factory,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        retry_delay: float = 0.5,
+        max_retry_delay: float = 60.0,
+        enabled: bool = True
+    ):
+        self.publisher = publisher
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.enabled = enabled
+        self.published = 0
+        self.failed = 0
+        self.last_error: Optional[str] = None
+        # Commit to publish, for the events this relay published
+        self.delivery_lag = LatencyStats()
+        self._wake = asyncio.Event()
+        self._stopping = False
+
+    @classmethod
+    def from_env(cls) -> "OutboxRelay":
+        """
+        Build the relay from environment variables.
+
+        EVENT_OUTBOX_RELAY            "off" to not run the relay in this process
+                                      (another replica drains the outbox)
+        EVENT_OUTBOX_BATCH_SIZE       events per drain transaction (default 100)
+        EVENT_OUTBOX_POLL_INTERVAL    seconds between checks when idle (default 1)
+        EVENT_OUTBOX_MAX_RETRY_DELAY  longest backoff after failures, in seconds (default 60)
+        """
+        return cls(
+            event_publisher,
+            batch_size=int(os.getenv("EVENT_OUTBOX_BATCH_SIZE", "100")),
+            poll_interval=float(os.getenv("EVENT_OUTBOX_POLL_INTERVAL", "1")),
+            max_retry_delay=float(os.getenv("EVENT_OUTBOX_MAX_RETRY_DELAY", "60")),
+            enabled=os.getenv("EVENT_OUTBOX_RELAY", "on").lower() != "off",
+        )
+
+    def wake(self) -> None:
+        """Drain now instead of at the next poll (call after committing events)."""
+        self._wake.set()
+
+    def _backoff(self, attempts: int) -> float:
+        return min(self.max_retry_delay, self.retry_delay * 2 ** (attempts - 1))
+
+    def _record_failure(self, row: OutboxEvent, error: str) -> None:
+        row.attempts += 1
+        row.last_error = (error.splitlines() or ["unknown error"])[0][:500]
+        row.available_at = datetime.now(timezone.utc) + timedelta(seconds=self._backoff(row.attempts))
+        self.failed += 1
+        self.last_error = row.last_error
+        print(f"Failed to publish outbox event {row.id} to {row.topic} (attempt {row.attempts}): {row.last_error}")
+
+    def _record_published(self, row: OutboxEvent, published: List[int]) -> None:
+        published.append(row.id)
+        self.delivery_lag.record((datetime.now(timezone.utc) - row.created_at.replace(tzinfo=timezone.utc)).total_seconds())
+
+    async def _publish_chain(self, rows: List[OutboxEvent], published: List[int]) -> None:
+        """Publish one user's events in order, stopping at the first failure."""
+        for row in rows:
+            try:
+                await self.publisher.publish(row.topic, {**row.payload, "event_id": row.id})
+            except Exception as e:
+                self._record_failure(row, str(e) or type(e).__name__)
+                return
+            self._record_published(row, published)
+
+    async def _publish_bulk(
+        self,
+        rows: List[OutboxEvent],
+        chains: "OrderedDict[Optional[str], List[OutboxEvent]]",
+        published: List[int]
+    ) -> None:
+        """Publish the batch with one bulk request per topic, then settle each user's chain in order."""
+        by_topic: "OrderedDict[str, List[OutboxEvent]]" = OrderedDict()
+        for row in rows:
+            by_topic.setdefault(row.topic, []).append(row)
+        errors: Dict[int, str] = {}
+        for topic, topic_rows in by_topic.items():
+            results = await self.publisher.publish_bulk(
+                topic, [{**row.payload, "event_id": row.id} for row in topic_rows]
+            )
+            errors.update({row.id: error for row, error in zip(topic_rows, results) if error is not None})
+
+        for chain in chains.values():
+            for row in chain:
+                if row.id in errors:
+                    # Later rows of this user stay and are sent again after it
+                    self._record_failure(row, errors[row.id])
+                    break
+                self._record_published(row, published)
+
+    async def drain_once(self) -> int:
+        """
+        Publish one batch of due events.
+
+        Returns the number of events attempted; 0 when there was nothing to
+        do or another relay holds the lock.
+        """
+        async with self.session_factory() as session:
+            locked = (await session.exec(select(func.pg_try_advisory_xact_lock(OUTBOX_LOCK_KEY)))).one()
+            if not locked:
+                return 0
+
+            # Skip users whose earlier event is waiting for a retry
+            earlier = aliased(OutboxEvent)
+            waiting = exists().where(
+                earlier.user_id == OutboxEvent.user_id,
+                earlier.id < OutboxEvent.id,
+                earlier.available_at > func.timezone("utc", func.now())
+            )
+            rows = (await session.exec(
+                select(OutboxEvent)
+                .where(OutboxEvent.available_at <= func.timezone("utc", func.now()), ~waiting)
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+            )).all()
+            if not rows:
+                return 0
+
+            chains: "OrderedDict[Optional[str], List[OutboxEvent]]" = OrderedDict()
+            for row in rows:
+                chains.setdefault(row.user_id, []).append(row)
+            published: List[int] = []
+            if self.publisher.bulk:
+                await self._publish_bulk(rows, chains, published)
+            else:
+                await asyncio.gather(*(self._publish_chain(chain, published) for chain in chains.values()))
+
+            # Failed rows were updated in place and are flushed with the commit
+            if published:
+                await session.exec(delete(OutboxEvent).where(OutboxEvent.id.in_(published)))
+            await session.commit()
+            self.published += len(published)
+            return len(rows)
+
+    async def run(self) -> None:
+        """Drain the outbox until ``stop`` is called; run as a background task."""
+        if not self.enabled:
+            return
+        self._stopping = False
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                attempted = await self.drain_once()
+            except Exception as e:
+                print(f"Outbox relay error: {e}")
+                attempted = 0
+            if attempted >= self.batch_size:
+                continue  # More may be due
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self, task: "asyncio.Task", timeout: float = 5.0) -> None:
+        """Let the relay finish its current batch, then end ``task`` (the one running ``run``)."""
+        self._stopping = True
+        self.wake()
+        try:
+            await asyncio.wait_for(task, timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Events published and failed attempts, and the commit-to-publish lag."""
+        return {
+            "enabled": self.enabled,
+            "published": self.published,
+            "failed_attempts": self.failed,
+            "last_error": self.last_error,
+            **self.delivery_lag.snapshot("lag_"),
+        }
+
+
+# Singleton instance
+outbox_relay = OutboxRelay.from_env()
@@ -1,5 +1,6 @@
 """Event publisher service using Dapr pub/sub for task events."""
-from typing import Optional
+from typing import Any, Dict, List, Optional
+import asyncio
 import httpx
 import json
 import os
@@ -8,33 +9,204 @@ from src.models import Task
 
 
 class EventPublisher:
-    """Publishes task events to Kafka via Dapr pub/sub."""
+    """
+    Publishes task events to Kafka via Dapr pub/sub.
     
-    def __init__(self):
+    All requests share one ``httpx.AsyncClient``, so connections to the
+    sidecar are kept alive and reused instead of being opened per event.
+    The client is opened by ``start`` (or on first use) and closed by
+    ``aclose``; the app lifespan calls both.
+    
+    ``publish`` sends one event. ``publish_bulk`` sends a list of events
+    (the outbox relay's batches) through Dapr's bulk publish API, up to
+    ``batch_max_events`` per request, and reports which were accepted. A
+    sidecar without the bulk API (Dapr before 1.10), or ``bulk`` off, means
+    the events are published one by one.
+    """
+    
+    def __init__(
+        self,
+        timeout: float = 2.0,
+        connect_timeout: float = 0.5,
+        max_connections: int = 32,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        bulk: bool = False,
+        batch_max_events: int = 100
+    ):
         self.dapr_port = os.getenv("DAPR_HTTP_PORT", "3500")
         self.dapr_url = f"http://localhost:{self.dapr_port}"
         self.pubsub_name = "kafka-pubsub"
+        # connect bounds TCP setup; the rest (including waiting for a
+        # pooled connection) bounds each request
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2
+        self.bulk = bulk
+        self.batch_max_events = batch_max_events
+        self._client: Optional[httpx.AsyncClient] = None
+        self.requests = 0
+        self.events_published = 0
+        self.events_failed = 0
+    
+    @classmethod
+    def from_env(cls) -> "EventPublisher":
+        """
+        Build the publisher from environment variables.
+        
+        DAPR_PUBLISH_TIMEOUT           seconds per publish request (default 2)
+        DAPR_PUBLISH_CONNECT_TIMEOUT   seconds to connect to the sidecar (default 0.5)
+        DAPR_PUBLISH_MAX_CONNECTIONS   pooled connections to the sidecar (default 32)
+        DAPR_PUBLISH_HTTP2             "true" to talk HTTP/2 (h2c) to a sidecar
+                                       that accepts it; needs httpx[http2]
+        DAPR_PUBLISH_BULK              "false" to send one request per event
+                                       instead of using the bulk publish API
+        DAPR_PUBLISH_BATCH_SIZE        most events per bulk request (default 100)
+        """
+        return cls(
+            timeout=float(os.getenv("DAPR_PUBLISH_TIMEOUT", "2")),
+            connect_timeout=float(os.getenv("DAPR_PUBLISH_CONNECT_TIMEOUT", "0.5")),
+            max_connections=int(os.getenv("DAPR_PUBLISH_MAX_CONNECTIONS", "32")),
+            http2=os.getenv("DAPR_PUBLISH_HTTP2", "false").lower() == "true",
+            bulk=os.getenv("DAPR_PUBLISH_BULK", "true").lower() != "false",
+            batch_max_events=int(os.getenv("DAPR_PUBLISH_BATCH_SIZE", "100")),
+        )
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            try:
+                # The sidecar speaks plain HTTP, so HTTP/2 means prior knowledge (h2c)
+                self._client = httpx.AsyncClient(
+                    timeout=self.timeout, limits=self.limits, http1=not self.http2, http2=self.http2
+                )
+            except ImportError:
+                print("HTTP/2 needs the h2 package (pip install httpx[http2]); publishing over HTTP/1.1")
+                self.http2 = False
+                self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+        return self._client
+    
+    async def start(self) -> None:
+        """Open the connection pool."""
+        self._get_client()
+    
+    async def aclose(self) -> None:
+        """Close pooled connections; a later publish opens a new pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def publish(self, topic: str, data: dict) -> None:
+        """Publish event to Dapr pub/sub; raises if the sidecar does not accept it."""
+        url = f"{self.dapr_url}/v1.0/publish/{self.pubsub_name}/{topic}"
+        self.requests += 1
+        try:
+            response = await self._get_client().post(url, json=data)
+            response.raise_for_status()
+        except Exception:
+            self.events_failed += 1
+            raise
+        self.events_published += 1
+    
+    async def publish_bulk(self, topic: str, events: List[dict]) -> List[Optional[str]]:
+        """
+        Publish events in as few requests as ``batch_max_events`` allows.
+        
+        Returns one entry per event, in order: None if the sidecar accepted
+        it, otherwise the error. Never raises for a failed publish.
+        """
+        errors: List[Optional[str]] = []
+        for start in range(0, len(events), self.batch_max_events):
+            chunk = events[start:start + self.batch_max_events]
+            if self.bulk:
+                chunk_errors = await self._publish_bulk_request(topic, chunk)
+            else:
+                chunk_errors = await self._publish_each(topic, chunk)
+            errors.extend(chunk_errors)
+        return errors
+    
+    async def _publish_bulk_request(self, topic: str, events: List[dict]) -> List[Optional[str]]:
+        url = f"{self.dapr_url}/v1.0-alpha1/publish/bulk/{self.pubsub_name}/{topic}"
+        entries = [
+            {"entryId": str(index), "event": event, "contentType": "application/json"}
+            for index, event in enumerate(events)
+        ]
+        self.requests += 1
+        try:
+            response = await self._get_client().post(url, json=entries)
+        except Exception as e:
+            errors: List[Optional[str]] = [(str(e).splitlines() or [type(e).__name__])[0]] * len(events)
+            self._count(errors)
+            return errors
         
+        if response.status_code in (404, 405) and "ERR_PUBSUB" not in response.text:
+            # Dapr errors (e.g. an unknown pubsub) carry an error code; a bare
+            # 404 means the sidecar predates the bulk API
+            print("Dapr sidecar has no bulk publish API; publishing events one by one")
+            self.bulk = False
+            return await self._publish_each(topic, events)
+        
+        errors = [None] * len(events)
+        if response.is_error:
+            try:
+                body: Dict[str, Any] = response.json()
+            except ValueError:
+                body = {}
+            failed = {
+                entry.get("entryId"): entry.get("error") or body.get("errorCode") or f"HTTP {response.status_code}"
+                for entry in body.get("failedEntries") or []
+            }
+            if failed:
+                errors = [failed.get(str(index)) for index in range(len(events))]
+            else:
+                errors = [body.get("message") or f"HTTP {response.status_code}"] * len(events)
+        self._count(errors)
+        return errors
+    
+    async def _publish_each(self, topic: str, events: List[dict]) -> List[Optional[str]]:
+        """Publish events concurrently, one request each."""
+        async def one(event: dict) -> Optional[str]:
+            try:
+                await self.publish(topic, event)
+                return None
+            except Exception as e:
+                return (str(e).splitlines() or [type(e).__name__])[0]
+        
+        return list(await asyncio.gather(*(one(event) for event in events)))
+    
+    def _count(self, errors: List[Optional[str]]) -> None:
+        failed = sum(error is not None for error in errors)
+        self.events_failed += failed
+        self.events_published += len(errors) - failed
+    
+    def stats(self) -> Dict[str, Any]:
+        """Requests sent to the sidecar and events it accepted or rejected."""
+        return {
+            "bulk": self.bulk,
+            "requests": self.requests,
+            "events_published": self.events_published,
+            "events_failed": self.events_failed,
+            "events_per_request": round(
+                (self.events_published + self.events_failed) / self.requests, 2
+            ) if self.requests else 0.0,
+        }
+    
     async def _publish(self, topic: str, data: dict) -> bool:
         """Publish event to Dapr pub/sub."""
         try:
-            url = f"{self.dapr_url}/v1.0/publish/{self.pubsub_name}/{topic}"
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url,
-                    json=data,
-                    headers={"Content-Type": "application/json"}
-                )
-                response.raise_for_status()
-                return True
+            await self.publish(topic, data)
+            return True
         except Exception as e:
             # Log error but don't fail the main operation
             print(f"Failed to publish event to {topic}: {e}")
             return False
     
-    async def publish_task_created(self, task: Task) -> bool:
-        """Publish task created event."""
-        event_data = {
+    def task_created_event(self, task: Task) -> dict:
+        """Build a task created event."""
+        return {
             "event_type": "task.created",
             "task_id": task.id,
             "user_id": task.user_id,
@@ -43,11 +215,10 @@ class EventPublisher:
             "recurrence_pattern": task.recurrence_pattern.value if task.recurrence_pattern else None,
             "timestamp": datetime.now().isoformat()
         }
-        return await self._publish("task-events", event_data)
     
-    async def publish_task_updated(self, task: Task, old_completed: bool) -> bool:
-        """Publish task updated event."""
-        event_data = {
+    def task_updated_event(self, task: Task, old_completed: bool) -> dict:
+        """Build a task updated event."""
+        return {
             "event_type": "task.updated",
             "task_id": task.id,
             "user_id": task.user_id,
@@ -59,17 +230,26 @@ class EventPublisher:
             "parent_task_id": task.parent_task_id,
             "timestamp": datetime.now().isoformat()
         }
-        return await self._publish("task-events", event_data)
     
-    async def publish_task_deleted(self, task_id: int, user_id: str) -> bool:
-        """Publish task deleted event."""
-        event_data = {
+    def task_deleted_event(self, task_id: int, user_id: str) -> dict:
+        """Build a task deleted event."""
+        return {
             "event_type": "task.deleted",
             "task_id": task_id,
             "user_id": user_id,
             "timestamp": datetime.now().isoformat()
         }
-        return await self._publish("task-events", event_data)
+    
+    def tasks_imported_event(self, user_id: str, import_id: str, imported: int, failed: int) -> dict:
+        """Build a tasks imported event (one per bulk import, instead of task.created per task)."""
+        return {
+            "event_type": "tasks.imported",
+            "user_id": user_id,
+            "import_id": import_id,
+            "imported": imported,
+            "failed": failed,
+            "timestamp": datetime.now().isoformat()
+        }
     
     async def publish_reminder(self, task: Task, reminder_time: datetime) -> bool:
         """Publish reminder notification event."""
@@ -87,4 +267,4 @@ class EventPublisher:
 
 
 # Singleton instance
-event_publisher = EventPublisher()
+event_publisher = EventPublisher.from_env()
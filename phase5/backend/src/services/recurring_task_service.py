@@ -1,14 +1,16 @@
 """Recurring task service for managing recurring task instances."""
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from src.models import Task, RecurrencePattern
+from src.services.task_cache import task_cache
 
 
 class RecurringTaskService:
     """Service for managing recurring task instances."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
     def calculate_next_due_date(
@@ -49,8 +51,8 @@ class RecurringTaskService:
         
         return True
     
-    def create_next_instance(self, parent_task: Task) -> Optional[Task]:
-        """Create the next instance of a recurring task."""
+    def build_next_instance(self, parent_task: Task) -> Optional[Task]:
+        """Build (without saving) the next instance of a recurring task."""
         if not self.should_create_instance(parent_task):
             return None
         
@@ -65,8 +67,7 @@ class RecurringTaskService:
         if parent_task.recurrence_end_date and next_due_date > parent_task.recurrence_end_date:
             return None
         
-        # Create new task instance
-        new_task = Task(
+        return Task(
             user_id=parent_task.user_id,
             title=parent_task.title,
             description=parent_task.description,
@@ -79,26 +80,34 @@ class RecurringTaskService:
             parent_task_id=parent_task.id,
             completed=False
         )
+    
+    async def create_next_instance(self, parent_task: Task) -> Optional[Task]:
+        """Create the next instance of a recurring task."""
+        new_task = self.build_next_instance(parent_task)
+        if new_task is None:
+            return None
         
         self.db.add(new_task)
-        self.db.commit()
-        self.db.refresh(new_task)
+        await self.db.commit()
+        await self.db.refresh(new_task)
+        await task_cache.ainvalidate(new_task.user_id)
         
         return new_task
     
-    def get_recurring_instances(self, parent_task_id: int) -> list[Task]:
+    async def get_recurring_instances(self, parent_task_id: int) -> list[Task]:
         """Get all instances of a recurring task."""
         statement = select(Task).where(Task.parent_task_id == parent_task_id)
-        results = self.db.exec(statement)
+        results = await self.db.exec(statement)
         return list(results.all())
     
-    def stop_recurrence(self, task: Task) -> bool:
+    async def stop_recurrence(self, task: Task) -> bool:
         """Stop a task from recurring by setting end date to now."""
         if not task.is_recurring:
             return False
         
         task.recurrence_end_date = datetime.now(timezone.utc)
         self.db.add(task)
-        self.db.commit()
+        await self.db.commit()
+        await task_cache.ainvalidate(task.user_id)
         
         return True
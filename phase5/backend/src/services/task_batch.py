@@ -0,0 +1,225 @@
+"""Batch task mutations executed as bulk statements in a single transaction."""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import insert, update, delete
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.models import Task, Priority, RecurrencePattern
+from src.schemas import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskBatchCreate,
+    TaskBatchUpdate,
+    TaskBatchDelete,
+    TaskBatchOperation,
+    TaskBatchResult,
+)
+from src.tags import normalize_tags
+from src.services.event_publisher import event_publisher
+from src.services.event_outbox import enqueue_events
+from src.services.recurring_task_service import RecurringTaskService
+
+
+def build_task(user_id: str, task_data: TaskCreate) -> Task:
+    """Build (without saving) a new task from a create request."""
+    # Parse priority
+    task_priority = Priority.medium
+    if task_data.priority:
+        try:
+            task_priority = Priority(task_data.priority.lower())
+        except ValueError:
+            task_priority = Priority.medium
+
+    # Parse recurrence pattern
+    recurrence_pattern = None
+    if task_data.is_recurring and task_data.recurrence_pattern:
+        try:
+            recurrence_pattern = RecurrencePattern(task_data.recurrence_pattern.lower())
+        except ValueError:
+            pass
+
+    return Task(
+        user_id=user_id,
+        title=task_data.title,
+        description=task_data.description,
+        priority=task_priority,
+        tags=normalize_tags(task_data.tags),
+        due_date=task_data.due_date,
+        is_recurring=task_data.is_recurring or False,
+        recurrence_pattern=recurrence_pattern,
+        recurrence_end_date=task_data.recurrence_end_date
+    )
+
+
+def parse_task_update(task_data: TaskUpdate) -> Dict[str, Any]:
+    """Column values for the fields set in an update request."""
+    update_data = task_data.model_dump(exclude_unset=True)
+
+    # Parse recurrence pattern if provided
+    if "recurrence_pattern" in update_data and update_data["recurrence_pattern"]:
+        try:
+            update_data["recurrence_pattern"] = RecurrencePattern(update_data["recurrence_pattern"].lower())
+        except ValueError:
+            update_data.pop("recurrence_pattern")
+
+    if update_data.get("priority"):
+        update_data["priority"] = Priority(update_data["priority"].lower())
+
+    if "tags" in update_data:
+        update_data["tags"] = normalize_tags(update_data["tags"])
+
+    return update_data
+
+
+def update_tasks_statement(
+    user_id: str,
+    task_ids: List[int],
+    values: Dict[str, Any],
+    expected_versions: Optional[List[int]] = None
+):
+    """
+    Single UPDATE ... RETURNING for some of a user's tasks.
+    
+    Rows are locked and their ``completed`` captured in a subquery before
+    the update, so each returned row is (task, old_completed) without a
+    separate SELECT. With ``expected_versions`` only rows whose version is
+    one of them are updated (compare-and-swap).
+    """
+    old = (
+        select(Task.id, Task.completed.label("old_completed"))
+        .where(Task.id.in_(task_ids), Task.user_id == user_id)
+    )
+    if expected_versions is not None:
+        old = old.where(Task.version.in_(expected_versions))
+    old = old.with_for_update().subquery()
+    return (
+        update(Task)
+        .where(Task.id == old.c.id)
+        .values(**values)
+        .returning(Task, old.c.old_completed)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_tasks_statement(user_id: str, task_ids: List[int]):
+    """Single DELETE ... RETURNING id for some of a user's tasks."""
+    return (
+        delete(Task)
+        .where(Task.id.in_(task_ids), Task.user_id == user_id)
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _group_key(values: Dict[str, Any]) -> tuple:
+    return tuple(sorted(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in values.items()
+    ))
+
+
+class TaskBatchService:
+    """
+    Applies a list of create/update/delete operations for one user.
+
+    All operations run in one transaction: creates become a single
+    multi-row INSERT ... RETURNING, updates sharing the same changes become
+    one UPDATE ... RETURNING each (so "complete all" is one statement), and
+    deletes become a single DELETE ... RETURNING. Operations that target a
+    missing task fail individually without aborting the batch. The events
+    for all changes go to the outbox in the same transaction.
+    """
+
+    def __init__(self, db: AsyncSession, user_id: str):
+        self.db = db
+        self.user_id = user_id
+        self.events: List[dict] = []
+
+    async def run(self, operations: List[TaskBatchOperation]) -> List[TaskBatchResult]:
+        """Apply the operations and return one result per operation, in order."""
+        target_ids = [op.id for op in operations if not isinstance(op, TaskBatchCreate)]
+        if len(target_ids) != len(set(target_ids)):
+            raise ValueError("Each task may be targeted by at most one update or delete operation")
+
+        results: List[Optional[TaskBatchResult]] = [None] * len(operations)
+        indexed = list(enumerate(operations))
+        try:
+            await self._create([(i, op) for i, op in indexed if isinstance(op, TaskBatchCreate)], results)
+            await self._update([(i, op) for i, op in indexed if isinstance(op, TaskBatchUpdate)], results)
+            await self._delete([(i, op) for i, op in indexed if isinstance(op, TaskBatchDelete)], results)
+            enqueue_events(self.db, self.events)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        return results
+
+    async def _insert(self, tasks: List[Task]) -> List[Task]:
+        if not tasks:
+            return []
+        rows = [task.model_dump(exclude={"id"}) for task in tasks]
+        statement = insert(Task).returning(Task, sort_by_parameter_order=True)
+        return list((await self.db.exec(statement, params=rows)).scalars())
+
+    async def _create(self, operations: List[Tuple[int, TaskBatchCreate]], results: list) -> None:
+        created = await self._insert([build_task(self.user_id, op.data) for _, op in operations])
+        for (index, op), task in zip(operations, created):
+            results[index] = TaskBatchResult(
+                index=index, op=op.op, status=201,
+                task_id=task.id, task=TaskResponse.model_validate(task)
+            )
+            self.events.append(event_publisher.task_created_event(task))
+
+    async def _update(self, operations: List[Tuple[int, TaskBatchUpdate]], results: list) -> None:
+        now = datetime.now(timezone.utc)
+        groups: Dict[tuple, Tuple[Dict[str, Any], List[Tuple[int, TaskBatchUpdate]]]] = {}
+        for index, op in operations:
+            values = parse_task_update(op.data)
+            values["updated_at"] = now
+            groups.setdefault(_group_key(values), (values, []))[1].append((index, op))
+
+        recurring_service = RecurringTaskService(self.db)
+        next_instances = []
+        for values, items in groups.values():
+            # Captures completed before the update, so the task.updated
+            # events can carry old_completed
+            statement = update_tasks_statement(self.user_id, [op.id for _, op in items], values)
+            updated = {task.id: (task, old_completed) for task, old_completed in await self.db.exec(statement)}
+
+            for index, op in items:
+                if op.id not in updated:
+                    results[index] = TaskBatchResult(
+                        index=index, op=op.op, status=404, task_id=op.id, error="Task not found"
+                    )
+                    continue
+                task, old_completed = updated[op.id]
+                results[index] = TaskBatchResult(
+                    index=index, op=op.op, status=200,
+                    task_id=task.id, task=TaskResponse.model_validate(task)
+                )
+                self.events.append(event_publisher.task_updated_event(task, old_completed))
+
+                # If task was just completed and is recurring, create next instance
+                if task.completed and not old_completed and task.is_recurring:
+                    next_instance = recurring_service.build_next_instance(task)
+                    if next_instance:
+                        next_instances.append(next_instance)
+
+        for task in await self._insert(next_instances):
+            self.events.append(event_publisher.task_created_event(task))
+
+    async def _delete(self, operations: List[Tuple[int, TaskBatchDelete]], results: list) -> None:
+        if not operations:
+            return
+        statement = delete_tasks_statement(self.user_id, [op.id for _, op in operations])
+        deleted = set((await self.db.exec(statement)).scalars())
+        for index, op in operations:
+            if op.id in deleted:
+                results[index] = TaskBatchResult(index=index, op=op.op, status=204, task_id=op.id)
+                self.events.append(event_publisher.task_deleted_event(op.id, self.user_id))
+            else:
+                results[index] = TaskBatchResult(
+                    index=index, op=op.op, status=404, task_id=op.id, error="Task not found"
+                )
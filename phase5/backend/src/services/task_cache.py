@@ -0,0 +1,310 @@
+"""Read-through cache for task listings (REST API and MCP list_tasks)."""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+import httpx
+
+_MISSING = object()
+
+
+class MemoryStateStore:
+    """
+    In-process stand-in for the shared state store.
+
+    Only visible to the current process, so writes made by other processes
+    (e.g. the recurring processor) show up once cached entries expire.
+    """
+
+    # Cached listings are already kept in the local LRU, so only the
+    # per-user generation tokens are stored here
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, tuple] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl if ttl else None, value)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set(key, value, ttl)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class DaprStateStore:
+    """Dapr state store (the ``statestore`` component, backed by PostgreSQL)."""
+
+    shared = True
+
+    def __init__(self, store_name: str = "statestore", timeout: float = 0.5):
+        self.dapr_port = os.getenv("DAPR_HTTP_PORT", "3500")
+        self.state_url = f"http://localhost:{self.dapr_port}/v1.0/state/{store_name}"
+        self.timeout = timeout
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+
+    def _items(self, key: str, value: Any, ttl: Optional[float]) -> list:
+        item = {"key": key, "value": value}
+        if ttl:
+            item["metadata"] = {"ttlInSeconds": str(int(ttl))}
+        return [item]
+
+    @staticmethod
+    def _value(response: httpx.Response) -> Optional[Any]:
+        # Dapr answers 204 No Content for missing keys
+        response.raise_for_status()
+        if response.status_code == 204 or not response.content:
+            return None
+        return response.json()
+
+    def get(self, key: str) -> Optional[Any]:
+        if self._client is None:
+            self._client = httpx.Client(timeout=self.timeout)
+        return self._value(self._client.get(f"{self.state_url}/{key}"))
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if self._client is None:
+            self._client = httpx.Client(timeout=self.timeout)
+        self._client.post(self.state_url, json=self._items(key, value, ttl)).raise_for_status()
+
+    async def aget(self, key: str) -> Optional[Any]:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(timeout=self.timeout)
+        return self._value(await self._async_client.get(f"{self.state_url}/{key}"))
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(timeout=self.timeout)
+        response = await self._async_client.post(self.state_url, json=self._items(key, value, ttl))
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class TaskListCache:
+    """
+    Read-through cache of task listings, keyed by user and normalized filters.
+
+    Listings are kept in a bounded in-process LRU with a TTL and, when the
+    state store is shared, in the store too so that every replica can serve
+    them. Each user has a generation token in the store that is part of
+    every cache key; writes replace the token, which invalidates all of that
+    user's listings at once. Callers must invalidate after committing.
+
+    Cached values are shared between callers and must not be modified.
+    """
+
+    def __init__(self, store, ttl: float = 30.0, max_entries: int = 1024, enabled: bool = True):
+        self.store = store
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "TaskListCache":
+        """
+        Build the cache from environment variables.
+
+        TASK_CACHE_BACKEND       "off" (default), "dapr" or "memory". "memory"
+                                 is for a single process only: other workers,
+                                 replicas and the recurring processor don't see
+                                 its invalidations and serve stale listings for
+                                 up to TASK_CACHE_TTL after a write
+        TASK_CACHE_STATESTORE    Dapr state store name, defaults to "statestore"
+        TASK_CACHE_TTL           seconds a listing stays cached (default 30)
+        TASK_CACHE_MAX_ENTRIES   size of the in-process LRU (default 1024)
+        """
+        backend = os.getenv("TASK_CACHE_BACKEND", "off").lower()
+        if backend == "dapr":
+            store = DaprStateStore(os.getenv("TASK_CACHE_STATESTORE", "statestore"))
+        else:
+            store = MemoryStateStore()
+        return cls(
+            store,
+            ttl=float(os.getenv("TASK_CACHE_TTL", "30")),
+            max_entries=int(os.getenv("TASK_CACHE_MAX_ENTRIES", "1024")),
+            enabled=backend != "off",
+        )
+
+    @staticmethod
+    def _generation_key(user_id: str) -> str:
+        return f"tasks:{user_id}:generation"
+
+    @staticmethod
+    def _entry_key(user_id: str, generation: str, scope: str, params: Dict[str, Any]) -> str:
+        raw = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        return f"tasks:{user_id}:{generation}:{scope}:{digest}"
+
+    def _get_local(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def _set_local(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _drop_local(self, user_id: str) -> None:
+        prefix = f"tasks:{user_id}:"
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_or_load(
+        self, user_id: str, scope: str, params: Dict[str, Any], load: Callable[[], Any]
+    ) -> Any:
+        """
+        Return the cached listing for ``params``, calling ``load`` on a miss.
+
+        ``scope`` separates callers that cache different shapes for the same
+        filters. ``load`` must return a JSON-serializable value; exceptions
+        it raises propagate and nothing is cached.
+        """
+        if not self.enabled:
+            return load()
+        # The generation is read before loading, so a write that commits
+        # while we query bumps it and the (possibly stale) result is orphaned
+        try:
+            generation = self.store.get(self._generation_key(user_id)) or "0"
+        except Exception as e:
+            print(f"Task cache unavailable: {e}")
+            return load()
+
+        key = self._entry_key(user_id, generation, scope, params)
+        value = self._get_local(key)
+        if value is _MISSING and self.store.shared:
+            try:
+                value = self.store.get(key)
+            except Exception as e:
+                print(f"Failed to read task cache entry: {e}")
+            value = _MISSING if value is None else value
+            if value is not _MISSING:
+                self._set_local(key, value)
+        if value is not _MISSING:
+            self._record(hit=True)
+            return value
+
+        self._record(hit=False)
+        value = load()
+        self._set_local(key, value)
+        if self.store.shared:
+            try:
+                self.store.set(key, value, self.ttl)
+            except Exception as e:
+                print(f"Failed to write task cache entry: {e}")
+        return value
+
+    async def aget_or_load(
+        self, user_id: str, scope: str, params: Dict[str, Any], load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Async variant of ``get_or_load`` for an async ``load``."""
+        if not self.enabled:
+            return await load()
+        try:
+            generation = await self.store.aget(self._generation_key(user_id)) or "0"
+        except Exception as e:
+            print(f"Task cache unavailable: {e}")
+            return await load()
+
+        key = self._entry_key(user_id, generation, scope, params)
+        value = self._get_local(key)
+        if value is _MISSING and self.store.shared:
+            try:
+                value = await self.store.aget(key)
+            except Exception as e:
+                print(f"Failed to read task cache entry: {e}")
+            value = _MISSING if value is None else value
+            if value is not _MISSING:
+                self._set_local(key, value)
+        if value is not _MISSING:
+            self._record(hit=True)
+            return value
+
+        self._record(hit=False)
+        value = await load()
+        self._set_local(key, value)
+        if self.store.shared:
+            try:
+                await self.store.aset(key, value, self.ttl)
+            except Exception as e:
+                print(f"Failed to write task cache entry: {e}")
+        return value
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop every cached listing of a user. Call after the write has committed."""
+        if not self.enabled:
+            return
+        self._drop_local(user_id)
+        try:
+            self.store.set(self._generation_key(user_id), uuid.uuid4().hex)
+        except Exception as e:
+            print(f"Failed to invalidate task cache for user {user_id}: {e}")
+
+    async def ainvalidate(self, user_id: str) -> None:
+        """Async variant of ``invalidate``."""
+        if not self.enabled:
+            return
+        self._drop_local(user_id)
+        try:
+            await self.store.aset(self._generation_key(user_id), uuid.uuid4().hex)
+        except Exception as e:
+            print(f"Failed to invalidate task cache for user {user_id}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and the current size of the in-process LRU."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+# Singleton instance
+task_cache = TaskListCache.from_env()
@@ -0,0 +1,230 @@
+"""Bulk task import from streamed NDJSON or CSV, loaded with COPY."""
+import codecs
+import csv
+import json
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.schemas import TaskImportRow, TaskImportError, TaskImportResponse
+from src.models import Priority
+from src.tags import normalize_tags
+from src.services.event_outbox import enqueue_event
+from src.services.event_publisher import event_publisher
+
+# Rows validated and copied per round trip
+IMPORT_CHUNK_SIZE = 1000
+# Per-row errors kept in the report; the failed count is always exact
+MAX_REPORTED_ERRORS = 1000
+# Finished imports kept for progress lookups
+MAX_TRACKED_IMPORTS = 100
+
+COPY_COLUMNS = (
+    "user_id",
+    "title",
+    "description",
+    "completed",
+    "priority",
+    "tags",
+    "due_date",
+    "is_recurring",
+    "recurrence_pattern",
+    "recurrence_end_date",
+    "created_at",
+    "updated_at",
+)
+
+# Progress of running and recent imports, by (user_id, import_id). Kept
+# in-process, so progress is only visible from the replica doing the import.
+_imports: "OrderedDict[Tuple[str, str], TaskImportResponse]" = OrderedDict()
+
+
+def get_import_progress(user_id: str, import_id: str) -> Optional[TaskImportResponse]:
+    """Progress (or final report) of one of the user's imports."""
+    return _imports.get((user_id, import_id))
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines, without the line endings."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def _ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Any]:
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+
+
+async def _csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Any]:
+    """Yield one dict per CSV record; quoted fields may span lines."""
+    header = None
+    record = []
+    async for line in lines:
+        record.append(line)
+        text = "\n".join(record)
+        # An odd number of quotes means a quoted field continues on the next line
+        if text.count('"') % 2:
+            continue
+        record = []
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield {
+            name: value for name, value in zip(header, values)
+            # Empty cells mean "not set"
+            if value != ""
+        }
+    if record:
+        yield ValueError("Unterminated quoted field")
+
+
+def _parse_csv_record(record: Dict[str, str]) -> Dict[str, Any]:
+    if "tags" in record:
+        record["tags"] = [tag for tag in record["tags"].split(",") if tag.strip()]
+    return record
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+            for item in error.errors()
+        )
+    return str(error)
+
+
+class TaskImporter:
+    """
+    Imports tasks for one user from a stream of NDJSON or CSV lines.
+
+    Rows are validated against ``TaskImportRow`` (``TaskCreate`` plus
+    ``completed``) in chunks of ``IMPORT_CHUNK_SIZE`` and each chunk is
+    loaded with a single COPY. Invalid rows are reported and skipped; valid
+    rows are committed together at the end, in the same transaction as the
+    ``tasks.imported`` outbox event, so an interrupted upload imports
+    nothing (and publishes nothing) and can simply be retried. CSV input needs a header row
+    naming the columns; ``tags`` is comma-separated.
+    """
+
+    def __init__(self, db: AsyncSession, user_id: str, import_id: Optional[str] = None):
+        self.db = db
+        self.user_id = user_id
+        self.progress = TaskImportResponse(import_id=import_id or str(uuid.uuid4()), status="running")
+
+    def _track(self) -> None:
+        key = (self.user_id, self.progress.import_id)
+        _imports[key] = self.progress
+        _imports.move_to_end(key)
+        while len(_imports) > MAX_TRACKED_IMPORTS:
+            _imports.popitem(last=False)
+
+    def _fail_row(self, row: int, error: Exception) -> None:
+        self.progress.failed += 1
+        if len(self.progress.errors) < MAX_REPORTED_ERRORS:
+            self.progress.errors.append(TaskImportError(row=row, error=_error_message(error)))
+        else:
+            self.progress.errors_truncated = True
+
+    def _copy_record(self, data: TaskImportRow, now: datetime) -> tuple:
+        # Same defaults as build_task, without constructing a Task model
+        # (which costs more than validation and COPY combined)
+        return (
+            self.user_id,
+            data.title,
+            data.description,
+            data.completed or False,
+            # The schema only admits lowercase names, which SQLAlchemy stores
+            data.priority or Priority.medium.name,
+            normalize_tags(data.tags),
+            _naive_utc(data.due_date),
+            data.is_recurring or False,
+            data.recurrence_pattern if data.is_recurring else None,
+            _naive_utc(data.recurrence_end_date),
+            now,
+            now,
+        )
+
+    async def _copy(self, records: List[tuple]) -> None:
+        if not records:
+            return
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        if not raw.driver_connection.is_in_transaction():
+            # Outside a transaction each COPY commits on its own, and a
+            # failed import would leave its earlier chunks behind
+            raise RuntimeError("Task import COPY must run inside a transaction")
+        await raw.driver_connection.copy_records_to_table(
+            "tasks", records=records, columns=COPY_COLUMNS
+        )
+        self.progress.imported += len(records)
+
+    async def run(self, lines: AsyncIterator[str], import_format: str) -> TaskImportResponse:
+        """Import every row; returns the final report."""
+        self._track()
+        records = _csv_records(lines) if import_format == "csv" else _ndjson_records(lines)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        chunk: List[tuple] = []
+        try:
+            # The asyncpg dialect only sends BEGIN with the first statement,
+            # and COPY on the driver connection does not count as one
+            connection = await self.db.connection()
+            await connection.exec_driver_sql("SELECT 1")
+            async for record in records:
+                self.progress.rows += 1
+                row = self.progress.rows
+                try:
+                    if isinstance(record, Exception):
+                        raise record
+                    if import_format == "csv":
+                        record = _parse_csv_record(record)
+                    data = TaskImportRow.model_validate(record)
+                    chunk.append(self._copy_record(data, now))
+                except (ValidationError, ValueError, TypeError) as e:
+                    self._fail_row(row, e)
+                    continue
+
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    await self._copy(chunk)
+                    chunk = []
+
+            await self._copy(chunk)
+            if self.progress.imported:
+                # One summary event instead of task.created per task, in
+                # the transaction the COPYs ran in
+                enqueue_event(self.db, event_publisher.tasks_imported_event(
+                    self.user_id, self.progress.import_id, self.progress.imported, self.progress.failed
+                ))
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            self.progress.imported = 0
+            self.progress.status = "failed"
+            raise
+
+        self.progress.status = "completed"
+        return self.progress
@@ -0,0 +1,45 @@
+"""Tag normalization and SQL tag filters for tasks."""
+
+from typing import Iterable, List, Optional
+
+from sqlalchemy import cast, ARRAY, String
+
+from .models import Task
+
+TAG_MODES = ("any", "all")
+
+
+def normalize_tags(tags: Optional[Iterable[str]]) -> Optional[List[str]]:
+    """
+    Lowercase, trim and de-duplicate tags, keeping their first-seen order.
+
+    Tags are stored normalized so that the GIN index on ``tasks.tags`` can
+    answer case-insensitive tag filters directly.
+    """
+    if tags is None:
+        return None
+    normalized = []
+    for tag in tags:
+        tag = tag.strip().lower()
+        if tag and tag not in normalized:
+            normalized.append(tag)
+    return normalized or None
+
+
+def parse_tag_filter(values: Optional[Iterable[str]]) -> List[str]:
+    """Flatten repeated and comma-separated tag query values into normalized tags."""
+    if not values:
+        return []
+    return normalize_tags(part for value in values for part in value.split(",")) or []
+
+
+def tag_filter_clause(tags: List[str], mode: str = "any"):
+    """
+    WHERE clause matching tasks that carry any (``&&``) or all (``@>``) of ``tags``.
+
+    Both operators are served by the GIN index on ``tasks.tags``.
+    """
+    values = cast(tags, ARRAY(String))
+    if mode == "all":
+        return Task.tags.op("@>")(values)
+    return Task.tags.op("&&")(values)
@@ -0,0 +1,185 @@
+"""Cache of verified access tokens, with revocations shared across workers."""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import asyncpg
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .models import RevokedToken
+
+# Postgres NOTIFY channel carrying "<token hash>:<exp>" for every revocation
+REVOCATION_CHANNEL = "revoked_tokens"
+
+
+def token_hash(token: str) -> str:
+    """SHA-256 of a token, so neither the cache nor the database holds raw tokens."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens whose signature and claims were already verified.
+
+    Entries map a token hash to its user id and expire at the token's
+    ``exp``. Revoked tokens are evicted and remembered until they expire, so
+    a revoked token is never cached again even though its signature stays
+    valid. Other workers learn about revocations through ``listen``.
+    """
+
+    def __init__(self, max_entries: int = 10000, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}
+        self._listening = False
+
+    @classmethod
+    def from_env(cls) -> "VerifiedTokenCache":
+        """
+        Build the cache from environment variables.
+
+        JWT_CACHE_SIZE   verified tokens kept in memory (default 10000, 0 disables)
+        """
+        max_entries = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+        return cls(max_entries=max_entries, enabled=max_entries > 0)
+
+    def get(self, digest: str) -> Optional[str]:
+        """User id of a verified, unexpired and unrevoked token, or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            user_id, exp = entry
+            if exp <= time.time():
+                del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return user_id
+
+    def put(self, digest: str, user_id: str, exp: float) -> None:
+        """Remember a verified token until ``exp`` (a Unix timestamp)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            # A revocation may have arrived while the token was being decoded
+            if digest in self._revoked:
+                return
+            self._entries[digest] = (user_id, exp)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_revoked(self, digest: str) -> bool:
+        with self._lock:
+            exp = self._revoked.get(digest)
+            if exp is not None and exp <= time.time():
+                # Expired tokens are rejected by the decode anyway
+                del self._revoked[digest]
+                return False
+            return exp is not None
+
+    def mark_revoked(self, digest: str, exp: float) -> None:
+        """Evict a token and reject it until it expires."""
+        with self._lock:
+            self._entries.pop(digest, None)
+            self._revoked[digest] = exp
+            now = time.time()
+            for key in [key for key, expires in self._revoked.items() if expires <= now]:
+                del self._revoked[key]
+
+    def _on_notification(self, _connection, _pid, _channel, payload: str) -> None:
+        digest, _, exp = payload.partition(":")
+        try:
+            self.mark_revoked(digest, float(exp))
+        except ValueError:
+            print(f"Ignoring malformed token revocation: {payload!r}")
+
+    async def listen(self, dsn: str, retry_delay: float = 5.0, **connect_kwargs) -> None:
+        """
+        Apply revocations made by any worker, until cancelled.
+
+        Holds one dedicated connection (outside the pool) that LISTENs on
+        ``REVOCATION_CHANNEL``. After every (re)connect the unexpired
+        revocations are reloaded from ``revoked_tokens``, so nothing sent
+        while disconnected is missed. LISTEN needs a session-level
+        connection: behind PgBouncer in transaction mode, point ``dsn`` at
+        Postgres directly (the app uses ``DATABASE_DIRECT_URL``).
+        """
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn, **connect_kwargs)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _connection: closed.set())
+                await connection.add_listener(REVOCATION_CHANNEL, self._on_notification)
+                rows = await connection.fetch(
+                    "SELECT token_hash, expires_at FROM revoked_tokens WHERE expires_at > timezone('utc', now())"
+                )
+                for row in rows:
+                    self.mark_revoked(row["token_hash"], row["expires_at"].replace(tzinfo=timezone.utc).timestamp())
+                self._listening = True
+                await closed.wait()
+                print("Token revocation listener disconnected, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Token revocation listener failed: {e}")
+            finally:
+                self._listening = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(retry_delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, cache size and known revocations."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "revoked": len(self._revoked),
+                "listening": self._listening,
+            }
+
+
+async def revoke_token(session: AsyncSession, token: str, exp: float) -> None:
+    """
+    Revoke a token for every worker.
+
+    The revocation is stored until the token expires and broadcast with
+    NOTIFY, which Postgres delivers when the transaction commits. The local
+    cache is updated at once, without waiting for the notification.
+    """
+    digest = token_hash(token)
+    expires_at = datetime.fromtimestamp(exp, timezone.utc)
+    await session.exec(
+        insert(RevokedToken)
+        .values(token_hash=digest, expires_at=expires_at)
+        .on_conflict_do_nothing(index_elements=[RevokedToken.token_hash])
+    )
+    # Revocations are only needed until the token expires
+    await session.exec(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc)))
+    await session.exec(select(func.pg_notify(REVOCATION_CHANNEL, f"{digest}:{exp}")))
+    await session.commit()
+    token_cache.mark_revoked(digest, exp)
+
+
+# Singleton instance
+token_cache = VerifiedTokenCache.from_env()